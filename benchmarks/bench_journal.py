@@ -0,0 +1,65 @@
+"""Per-edit cost of JsonFileStorage vs JournalStorage as the task count grows.
+
+Usage: python benchmarks/bench_journal.py [--sizes 1000 10000 100000 1000000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from datasets import STATUSES, synthetic_tasks  # noqa: E402
+from storage import JsonFileStorage, JournalStorage  # noqa: E402
+from task_manager import TaskManager  # noqa: E402
+
+
+def time_edits(manager, edits):
+    ids = [task['id'] for task in manager.tasks[:edits]]
+    samples = []
+    for n, task_id in enumerate(ids):
+        start = time.perf_counter()
+        manager.update_task_status(task_id, STATUSES[n % 3])
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2], sum(samples) / len(samples)
+
+
+def run(size, edits, full_max):
+    workdir = tempfile.mkdtemp(prefix='bench_journal_')
+    try:
+        filename = os.path.join(workdir, 'tasks.json')
+        JsonFileStorage(filename).save(synthetic_tasks(size))
+        rows = []
+
+        manager = TaskManager(filename, storage=JournalStorage(filename))
+        rows.append(('journal',) + time_edits(manager, edits))
+        manager.close()
+
+        if size <= full_max:
+            manager = TaskManager(filename, storage=JsonFileStorage(filename))
+            rows.append(('full rewrite',) + time_edits(manager, edits))
+            manager.close()
+        return rows
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--edits', type=int, default=200)
+    parser.add_argument('--full-max', type=int, default=100000,
+                        help="skip the full-rewrite baseline above this many tasks")
+    args = parser.parse_args()
+
+    print(f"{'tasks':>10}  {'storage':<14}{'median us':>12}{'mean us':>12}")
+    for size in args.sizes:
+        for name, median, mean in run(size, args.edits, args.full_max):
+            print(f"{size:>10}  {name:<14}{median * 1e6:>12.1f}{mean * 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
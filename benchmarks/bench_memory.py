@@ -0,0 +1,65 @@
+"""tracemalloc comparison of plain task dicts and compact Task objects.
+
+Usage: python benchmarks/bench_memory.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from datasets import synthetic_tasks  # noqa: E402
+from task_model import Task  # noqa: E402
+from task_store import TaskStore  # noqa: E402
+
+
+def retained(build, text):
+    """Bytes still allocated after ``build(text)`` returns, keeping its result alive."""
+    gc.collect()
+    tracemalloc.start()
+    result = build(text)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def as_dicts(text):
+    return json.loads(text)
+
+
+def as_tasks(text):
+    return [Task.from_mapping(task) for task in json.loads(text)]
+
+
+def as_store(text):
+    store = TaskStore(json.loads(text))
+    store.finish_indexing()
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--with-store', action='store_true',
+                        help="also measure a full TaskStore including its indexes")
+    args = parser.parse_args()
+
+    layouts = [('dicts', as_dicts), ('Task slots', as_tasks)]
+    if args.with_store:
+        layouts.append(('TaskStore', as_store))
+    print(f"{'tasks':>10}  {'layout':<12}{'retained MB':>13}{'peak MB':>10}{'B/task':>9}")
+    for size in args.sizes:
+        text = json.dumps(synthetic_tasks(size))
+        for name, build in layouts:
+            current, peak = retained(build, text)
+            print(f"{size:>10}  {name:<12}{current / 2**20:>13.1f}{peak / 2**20:>10.1f}"
+                  f"{current / size:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
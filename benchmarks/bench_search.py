@@ -0,0 +1,62 @@
+"""Compare the n-gram search index with the old linear scan.
+
+Usage: python benchmarks/bench_search.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from datasets import synthetic_tasks  # noqa: E402
+from task_store import TaskStore  # noqa: E402
+
+QUERIES = ["delta", "budget 42", "4821", "in prog", "zu/xr", "no such task"]
+
+
+def linear_search(tasks, terms):
+    def match_task(task):
+        for term in terms:
+            if (term in str(task['id']).lower() or
+                    term in task['name'].lower() or
+                    term in task['status'].lower()):
+                return True
+        return False
+    return [task for task in tasks if match_task(task)]
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>10}  {'query':<14}{'hits':>9}{'scan ms':>11}{'index ms':>11}{'speedup':>9}")
+    for size in args.sizes:
+        tasks = synthetic_tasks(size)
+        start = time.perf_counter()
+        store = TaskStore(tasks)
+        store.finish_indexing()
+        print(f"{size:>10}  index build {time.perf_counter() - start:.2f}s")
+        for query in QUERIES:
+            terms = [term.strip().lower() for term in query.split('/')]
+            scan, expected = best_of(lambda: linear_search(tasks, terms), args.repeat)
+            indexed, result = best_of(lambda: store.search(terms), args.repeat)
+            if sorted(t['id'] for t in expected) != [t['id'] for t in result]:
+                raise SystemExit(f"Index and scan disagree for {query!r}")
+            print(f"{size:>10}  {query:<14}{len(result):>9}{scan * 1e3:>11.2f}"
+                  f"{indexed * 1e3:>11.2f}{scan / max(indexed, 1e-9):>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
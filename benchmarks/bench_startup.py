@@ -0,0 +1,76 @@
+"""Cold start time of TaskManager with and without the binary snapshot cache.
+
+"loaded" is when TaskManager is built; "first paint" adds filling the
+task lists for the first screen (headless Main, virtual lists), which is
+when the window shows tasks.  "searchable" adds the deferred priority, due
+date and n-gram indexes that the app builds in slices after the first paint.
+
+Usage: python benchmarks/bench_startup.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from datasets import synthetic_tasks  # noqa: E402
+from headless_ui import HeadlessMain  # noqa: E402
+from snapshot_cache import cache_filename  # noqa: E402
+from storage import JsonFileStorage, JournalStorage  # noqa: E402
+from task_manager import TaskManager  # noqa: E402
+
+
+def start(filename, cache):
+    begin = time.perf_counter()
+    manager = TaskManager(filename, storage=JournalStorage(filename, cache=cache))
+    loaded = time.perf_counter() - begin
+    HeadlessMain(manager).update_task_views()
+    painted = time.perf_counter() - begin
+    manager.finish_loading()
+    searchable = time.perf_counter() - begin
+    manager.close()
+    return loaded, painted, searchable
+
+
+def run(size):
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        filename = os.path.join(workdir, 'tasks.json')
+        JsonFileStorage(filename, cache=False).save(synthetic_tasks(size))
+        rows = [('json, no cache',) + start(filename, cache=False),
+                ('json, cache miss',) + start(filename, cache=True),
+                ('cache hit',) + start(filename, cache=True)]
+        assert os.path.exists(cache_filename(filename))
+        return rows
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def time_import(module):
+    begin = time.perf_counter()
+    try:
+        __import__(module)
+    except ImportError:
+        return None
+    return time.perf_counter() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    seconds = time_import('tkcalendar')
+    if seconds is not None:
+        print(f"import tkcalendar (now deferred until after the first paint): {seconds:.3f}s")
+    print(f"{'tasks':>10}  {'path':<18}{'loaded s':>10}{'first paint s':>15}{'searchable s':>14}")
+    for size in args.sizes:
+        for name, loaded, painted, searchable in run(size):
+            print(f"{size:>10}  {name:<18}{loaded:>10.3f}{painted:>15.3f}{searchable:>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+import random
+
+STATUSES = ["TO DO", "IN PROGRESS", "COMPLETED"]
+PRIORITIES = ["Low", "Medium", "High"]
+WORDS = ("alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima "
+         "mike november oscar papa quebec romeo sierra tango uniform victor whiskey "
+         "xray yankee zulu report review deploy invoice meeting budget design backup").split()
+
+
+def synthetic_tasks(count, seed=1735):
+    """Deterministic task dicts shaped like the ones the app stores."""
+    rng = random.Random(seed)
+    return [{
+        'id': i + 1,
+        'name': f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {rng.randint(1, 999)}",
+        'priority': PRIORITIES[rng.randrange(3)],
+        'due_date': f"{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}-{rng.randint(2023, 2026)}",
+        'status': STATUSES[rng.randrange(3)],
+    } for i in range(count)]
@@ -0,0 +1,110 @@
+"""Stand-ins that let the Main view logic run without a display.
+
+``HeadlessMain`` borrows Main's list-update methods and drives
+``HeadlessTaskList`` objects whose Treeview only records items in a dict,
+so the Python side of a refresh can be timed on a machine without X.
+For real Tk numbers run the suite with ``--tk`` under ``xvfb-run``.
+"""
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from task_list import TaskList  # noqa: E402
+from ui_components import Main  # noqa: E402
+
+
+class StubTreeview:
+    def __init__(self):
+        self.rows = {}
+        self.detached = {}
+        self.counter = itertools.count(1)
+        self.selected = ()
+
+    def insert(self, parent, index, iid=None, **options):
+        if iid is None:
+            iid = f"I{next(self.counter):06d}"
+        self.rows[iid] = options
+        return iid
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.rows[iid]
+
+    def get_children(self, item=''):
+        return tuple(self.rows)
+
+    def item(self, iid, **options):
+        self.rows[iid].update(options)
+
+    def detach(self, *iids):
+        for iid in iids:
+            self.detached[iid] = self.rows.pop(iid)
+
+    def move(self, iid, parent, index):
+        options = self.rows.pop(iid) if iid in self.rows else self.detached.pop(iid)
+        order = list(self.rows.items())
+        order.insert(index, (iid, options))
+        self.rows = dict(order)
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, items):
+        self.selected = tuple(items) if not isinstance(items, str) else (items,)
+
+    def yview_moveto(self, fraction):
+        pass
+
+
+class StubScrollbar:
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+class HeadlessTaskList(TaskList):
+    def __init__(self, task_manager, virtual=True, rows=30):
+        self.task_manager = task_manager
+        self.virtual = virtual
+        self.rows = rows
+        self.ids = []
+        self.members = set()
+        self.items = {}
+        self.offset = 0
+        self.slots = []
+        self.slot_ids = {}
+        self.selected = {}
+        self.click_mode = None
+        self.sort_field = None
+        self.sort_reverse = False
+        self.treeview = StubTreeview()
+        self.scrollbar = StubScrollbar()
+
+    def visible_rows(self):
+        return self.rows
+
+
+class HeadlessMain:
+    show_tasks = Main.show_tasks
+    on_tasks_changed = Main.on_tasks_changed
+    update_task_views = Main.update_task_views
+    sort_column = Main.sort_column
+    cancel_search = Main.cancel_search
+
+    def update_badges(self):
+        self.task_manager.summary()
+
+    def __init__(self, task_manager, virtual=True):
+        self.task_manager = task_manager
+        self.sort_column_name = None
+        self.sort_reverse = False
+        self.filtered = False
+        self.search_query = None
+        self.search_match = None
+        self.search_job = None
+        self.task1, self.task2, self.task3, self.task4, self.archive_list = (
+            HeadlessTaskList(task_manager, virtual) for _ in range(5))
+        self.archive_loaded = False
+        self.status_lists = {"TO DO": self.task2, "IN PROGRESS": self.task3, "COMPLETED": self.task4}
+        task_manager.subscribe(self.on_tasks_changed)
@@ -0,0 +1,307 @@
+"""Headless benchmark suite for TaskManager and the task list refresh path.
+
+Every operation is timed on a synthetic dataset of each size.  Results
+give latency percentiles, throughput and the peak memory allocated by one
+run.  They can be saved as JSON and compared with an earlier run.
+
+Usage:
+    python benchmarks/suite.py [--sizes 1000 100000 1000000] [--output results.json]
+    python benchmarks/suite.py --compare baseline.json --output results.json
+    xvfb-run python benchmarks/suite.py --tk      # real Treeviews instead of stubs
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from datasets import PRIORITIES, STATUSES, WORDS, synthetic_tasks  # noqa: E402
+from headless_ui import HeadlessMain  # noqa: E402
+from storage import JsonFileStorage, JournalStorage  # noqa: E402
+from task_export import CSV_HEADER  # noqa: E402
+from task_manager import TaskManager  # noqa: E402
+
+SEARCHES = ['alpha', 'rev', '42', 'to do', 'zzz', 'deploy/budget']
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(samples, items_per_call):
+    total = sum(samples)
+    return {
+        'calls': len(samples),
+        'p50_ms': percentile(samples, 0.50) * 1e3,
+        'p95_ms': percentile(samples, 0.95) * 1e3,
+        'p99_ms': percentile(samples, 0.99) * 1e3,
+        'max_ms': max(samples) * 1e3,
+        'items_per_s': items_per_call * len(samples) / total if total else None,
+    }
+
+
+def peak_memory(setup, run):
+    """Peak bytes allocated by one ``run(setup())``, not counting the setup."""
+    state = setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def measure(setup, run, calls, items_per_call=1):
+    samples = []
+    for _ in range(calls):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        samples.append(time.perf_counter() - start)
+    result = summarize(samples, items_per_call)
+    result['peak_kb'] = peak_memory(setup, run) / 1024
+    return result
+
+
+class Fixture:
+    """A loaded TaskManager of ``size`` tasks plus a headless or real Main."""
+
+    def __init__(self, size, workdir, real_tk=False):
+        self.size = size
+        self.workdir = workdir
+        self.filename = os.path.join(workdir, 'tasks.json')
+        JsonFileStorage(self.filename, cache=False).save(synthetic_tasks(size))
+        self.manager = TaskManager(self.filename, storage=JournalStorage(self.filename))
+        self.manager.finish_loading()
+        self.rng = random.Random(size)
+        self.root = None
+        if real_tk:
+            import tkinter as tk
+            from ui_components import Main
+            self.root = tk.Tk()
+            self.root.geometry("1280x720")
+            self.main = Main(self.root, self.manager, virtual=True)
+            self.root.update()
+        else:
+            self.main = HeadlessMain(self.manager)
+        self.main.update_task_views()
+
+    def paint(self):
+        if self.root is not None:
+            self.root.update_idletasks()
+
+    def random_task(self):
+        rng = self.rng
+        return (f"{rng.choice(WORDS).title()} {rng.choice(WORDS)}", rng.choice(PRIORITIES),
+                f"{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}-2025")
+
+    def csv_file(self):
+        path = os.path.join(self.workdir, 'import.csv')
+        if not os.path.exists(path):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(CSV_HEADER)
+                for task in synthetic_tasks(self.size, seed=self.size + 1):
+                    writer.writerow([task['id'], task['name'], task['priority'],
+                                     task['due_date'], task['status']])
+        return path
+
+    def close(self):
+        if self.root is not None:
+            self.root.destroy()
+        self.manager.close()
+
+
+def bench_add(fx, calls):
+    def run(_):
+        fx.manager.add_task(*fx.random_task())
+        fx.paint()
+    return measure(lambda: None, run, calls)
+
+
+def bench_update(fx, calls):
+    def setup():
+        return fx.rng.choice(fx.manager.store.ids()), fx.rng.choice(STATUSES)
+
+    def run(state):
+        fx.manager.update_task_status(*state)
+        fx.paint()
+    return measure(setup, run, calls)
+
+
+def bench_remove(fx, calls):
+    ids = fx.manager.store.ids()
+    fx.rng.shuffle(ids)
+    victims = iter(ids)
+
+    def run(task_id):
+        fx.manager.remove_task(task_id)
+        fx.paint()
+    return measure(lambda: next(victims), run, min(calls, len(ids) // 2))
+
+
+def bench_search(fx, calls):
+    queries = iter(SEARCHES * calls)
+    # A task change between samples invalidates the result cache, so each search does the work.
+    def setup():
+        fx.manager.add_task(*fx.random_task())
+        return next(queries)
+    return measure(setup, fx.manager.search_tasks, calls)
+
+
+def bench_cached_search(fx, calls):
+    """A repeated query, answered from the result cache."""
+    queries = iter(SEARCHES * calls)
+    def setup():
+        query = next(queries)
+        fx.manager.search_tasks(query)
+        return query
+    return measure(setup, fx.manager.search_tasks, calls)
+
+
+def bench_type_search(fx, calls):
+    """Every prefix of a word, as live search sees it while the word is typed."""
+    words = iter(WORDS * calls)
+
+    def run(word):
+        for end in range(1, len(word) + 1):
+            fx.manager.search_tasks(word[:end])
+    # A task change between samples makes each word start from a cold cache.
+    def setup():
+        fx.manager.add_task(*fx.random_task())
+        return next(words)
+    return measure(setup, run, calls)
+
+
+def bench_export(fx, calls):
+    path = os.path.join(fx.workdir, 'export.csv')
+    return measure(lambda: None, lambda _: fx.manager.export_tasks(path), calls, fx.size)
+
+
+def bench_import(fx, calls):
+    source = fx.csv_file()
+    managers = []
+
+    def setup():
+        filename = os.path.join(fx.workdir, f'import_target_{len(managers)}.json')
+        manager = TaskManager(filename, storage=JournalStorage(filename))
+        managers.append(manager)
+        return manager
+
+    def run(manager):
+        manager.import_tasks(source)
+
+    try:
+        return measure(setup, run, calls, fx.size)
+    finally:
+        for manager in managers:
+            manager.close()
+
+
+def bench_refresh(fx, calls):
+    def run(_):
+        fx.main.update_task_views()
+        fx.paint()
+    return measure(lambda: None, run, calls, fx.size)
+
+
+OPERATIONS = {
+    'add_task': bench_add,
+    'update_task_status': bench_update,
+    'remove_task': bench_remove,
+    'search_tasks': bench_search,
+    'search_tasks_cached': bench_cached_search,
+    'type_search': bench_type_search,
+    'export_tasks': bench_export,
+    'import_tasks': bench_import,
+    'update_task_views': bench_refresh,
+}
+# Operations over the whole dataset; they get --bulk-calls samples.
+BULK = {'export_tasks', 'import_tasks', 'update_task_views'}
+
+
+def run_suite(sizes, operations, calls, bulk_calls, real_tk=False):
+    """Yield one stats dict per operation and size."""
+    for size in sizes:
+        workdir = tempfile.mkdtemp(prefix='bench_suite_')
+        try:
+            fx = Fixture(size, workdir, real_tk)
+            try:
+                for name in operations:
+                    stats = OPERATIONS[name](fx, bulk_calls if name in BULK else calls)
+                    stats.update(operation=name, size=size)
+                    yield stats
+            finally:
+                fx.close()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare(results, baseline, threshold):
+    """Print p50 changes against ``baseline`` and return the regressions."""
+    previous = {(row['operation'], row['size']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        before = previous.get((row['operation'], row['size']))
+        if before is None or not before['p50_ms']:
+            continue
+        ratio = row['p50_ms'] / before['p50_ms']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions.append(row)
+        print(f"{row['size']:>9}  {row['operation']:<20}{before['p50_ms']:>11.3f}"
+              f"{row['p50_ms']:>11.3f}{ratio:>8.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--operations', nargs='+', choices=list(OPERATIONS), default=list(OPERATIONS))
+    parser.add_argument('--calls', type=int, default=200, help="samples for per-task operations")
+    parser.add_argument('--bulk-calls', type=int, default=3, help="samples for whole-dataset operations")
+    parser.add_argument('--tk', action='store_true', help="use real Tk widgets (needs a display or Xvfb)")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="relative p50 slowdown reported as a regression")
+    args = parser.parse_args()
+
+    print(f"{'tasks':>9}  {'operation':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'items/s':>13}{'peak KB':>11}")
+    results = []
+    for row in run_suite(args.sizes, args.operations, args.calls, args.bulk_calls, args.tk):
+        results.append(row)
+        print(f"{row['size']:>9}  {row['operation']:<20}{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}"
+              f"{row['p99_ms']:>10.3f}{row['items_per_s']:>13.0f}{row['peak_kb']:>11.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': platform.python_version(),
+                       'platform': platform.platform(),
+                       'ui': 'tk' if args.tk else 'headless',
+                       'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'results': results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\n{'tasks':>9}  {'operation':<20}{'base p50':>11}{'p50':>11}{'ratio':>9}")
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
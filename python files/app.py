@@ -1,17 +1,106 @@
+import queue
 import tkinter as tk
+from tkinter import messagebox
 from task_manager import TaskManager
-from ui_components import Sidebar, Main
+from config import load_config, open_archive, open_storage
+from due_scheduler import DueScheduler
+from instrumentation import start_profile, stop_profile
+from ui_components import DiagnosticsWindow, Sidebar, Main
+from undo_history import UndoHistory
 
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
+        self.profiler = start_profile()
         self.title("Task Manager")
         self.geometry("1280x720")
-        self.task_manager = TaskManager()
-        self.main = Main(self, self.task_manager)
+        self.settings = load_config()
+        self.storage_errors = queue.Queue()
+        storage = open_storage(self.settings)
+        storage.on_error = self.storage_errors.put
+        history = UndoHistory(int(self.settings['undo_memory_mb'] * 1024 * 1024))
+        self.task_manager = TaskManager(storage=storage, archive=open_archive(self.settings), history=history)
+        if self.settings['archive_after_days']:
+            # Before anything is drawn or indexed for tasks that are about to leave.
+            self.task_manager.archive_completed(self.settings['archive_after_days'])
+        self.main = Main(self, self.task_manager, virtual=self.settings['virtual_lists'])
         self.sidebar = Sidebar(self, self.task_manager, self.main)
+        self.scheduler = DueScheduler(self.task_manager, self.on_due, self.after, self.after_cancel,
+                                      upcoming_days=self.settings['upcoming_days'])
         
         self.main.update_task_views()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.diagnostics = None
+        self.bind("<F12>", self.show_diagnostics)
+        for key in ("<Control-z>", "<Control-Z>"):
+            self.bind(key, self.on_undo)
+        for key in ("<Control-y>", "<Control-Y>"):
+            self.bind(key, self.on_redo)
+        self.poll_job = None
+        self.errors_job = None
+        self.loading_job = None
+        self.check_storage_errors()
+        if self.settings['poll_interval']:
+            self.poll_job = self.after(int(self.settings['poll_interval'] * 1000), self.poll_external_changes)
+        self.loading_job = self.after_idle(self.finish_loading)
+
+    def finish_loading(self):
+        # Build the search index in slices so the first screen paints immediately.
+        if not self.task_manager.finish_loading(20000):
+            self.loading_job = self.after(1, self.finish_loading)
+        else:
+            self.loading_job = None
+            self.scheduler.start()
+
+    def on_due(self, kind, task_ids):
+        # The summary's overdue count moves with the clock, not only with edits.
+        self.sidebar.update_summary()
+        self.sidebar.show_reminder(kind, task_ids)
+
+    def poll_external_changes(self):
+        # Another instance may share the tasks file; merge whatever it saved.
+        self.task_manager.sync()
+        self.poll_job = self.after(int(self.settings['poll_interval'] * 1000), self.poll_external_changes)
+
+    def on_undo(self, event=None):
+        if not self.task_manager.undo():
+            self.bell()
+        return "break"
+
+    def on_redo(self, event=None):
+        if not self.task_manager.redo():
+            self.bell()
+        return "break"
+
+    def show_diagnostics(self, event=None):
+        if self.diagnostics is None or not self.diagnostics.winfo_exists():
+            self.diagnostics = DiagnosticsWindow(self)
+        self.diagnostics.lift()
+
+    def check_storage_errors(self):
+        # Storage may report from its writer thread; show errors from Tk's thread.
+        self.show_storage_errors()
+        self.errors_job = self.after(500, self.check_storage_errors)
+
+    def show_storage_errors(self):
+        messages = []
+        while not self.storage_errors.empty():
+            messages.append(self.storage_errors.get())
+        if messages:
+            messagebox.showerror("Save Error", "\n".join(dict.fromkeys(messages)))
+
+    def on_close(self):
+        # A job left queued would run against a closed task manager or a destroyed window.
+        for job in (self.poll_job, self.errors_job, self.loading_job):
+            if job is not None:
+                self.after_cancel(job)
+        self.poll_job = self.errors_job = self.loading_job = None
+        self.scheduler.stop()
+        self.task_manager.flush()
+        self.show_storage_errors()
+        self.task_manager.close()
+        stop_profile(self.profiler)
+        self.destroy()
         
 if __name__ == "__main__":
     app = App()
@@ -0,0 +1,236 @@
+"""Command-line access to the task list, without Tk.
+
+Usage:
+    python cli.py add "Write report" High 12-31-2025
+    python cli.py list [--status "TO DO"] [--json]
+    python cli.py query 'priority:High due<12-31-2025' [--json]
+    python cli.py update 12 15 --status COMPLETED
+    python cli.py update 12 --name "Write summary" --due 01-15-2026
+    python cli.py remove 12 15
+    python cli.py import tasks_import.csv
+    python cli.py export tasks.jsonl.gz [--query 'status:!COMPLETED']
+    python cli.py batch [--chunk-size 1000] < operations.jsonl > results.jsonl
+
+Settings come from config.json exactly as for app.py.  ``batch`` reads one
+JSON operation per line, e.g. ``{"op": "add", "name": "...", "priority":
+"Low", "due_date": "01-31-2026"}``, ``{"op": "update", "id": 12, "status":
+"COMPLETED"}``, ``{"op": "remove", "id": 12}`` or ``{"op": "get", "id": 12}``,
+and writes one JSON result per line.
+"""
+import argparse
+import json
+import sys
+
+from config import load_config, open_archive, open_storage
+from task_export import csv_rows, jsonl_lines
+from task_manager import TaskManager
+from task_query import parse_query, to_day
+from undo_history import UndoHistory
+
+DETAIL_FIELDS = ('name', 'priority', 'due_date')
+
+
+def open_task_manager(config_file):
+    config = load_config(config_file)
+    # A one-shot process has nothing to undo, so keep no history.
+    return TaskManager(storage=open_storage(config), archive=open_archive(config),
+                       history=UndoHistory(0))
+
+
+def add_task(task_manager, name, priority, due_date):
+    if not name or not priority or not due_date:
+        raise ValueError("name, priority and due_date are required")
+    to_day(due_date)
+    return task_manager.add_task(name, priority, due_date)
+
+
+def update_tasks(task_manager, task_ids, status=None, fields=None):
+    """Set ``status`` and/or the ``DETAIL_FIELDS`` in ``fields`` on every task in ``task_ids``."""
+    if status is None and not fields:
+        raise ValueError("nothing to update")
+    if fields and 'due_date' in fields:
+        to_day(fields['due_date'])
+    with task_manager.batch():
+        for task_id in task_ids:
+            task = task_manager.get_task_by_id(task_id)
+            if task is None:
+                raise ValueError(f"Task {task_id} not found")
+            if fields:
+                details = {key: fields.get(key, task[key]) for key in DETAIL_FIELDS}
+                if not task_manager.update_task_details(task_id, **details):
+                    raise ValueError(f"Task {task_id} is archived; change its status first")
+        if status is not None:
+            task_manager.update_statuses(task_ids, status)
+    return len(task_ids)
+
+
+def matching_tasks(task_manager, query):
+    """Tasks for search box text: filters through ``query``, plain text through ``search_tasks``."""
+    if not query:
+        return task_manager.export_source()
+    filters = parse_query(query)
+    if filters is None:
+        return task_manager.search_tasks(query)
+    return task_manager.export_source(filters)
+
+
+def write_tasks(tasks, out, as_json):
+    if as_json:
+        lines = jsonl_lines(tasks)
+    else:
+        lines = ('\t'.join(map(str, row)) + '\n' for row in csv_rows(tasks))
+    for line in lines:
+        out.write(line)
+
+
+def check_strings(op, keys):
+    for key in keys:
+        if op.get(key) is not None and not isinstance(op[key], str):
+            raise ValueError(f"'{key}' must be a string")
+
+
+def apply_operation(task_manager, op):
+    """Apply one batch operation and return its result fields; bad input raises ValueError."""
+    if not isinstance(op, dict):
+        raise ValueError("operation must be a JSON object")
+    kind = op.get('op')
+    check_strings(op, DETAIL_FIELDS + ('status',))
+    if kind == 'add':
+        return {'id': add_task(task_manager, op.get('name'), op.get('priority'), op.get('due_date'))}
+    task_id = op.get('id')
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        raise ValueError("'id' must be an integer")
+    if kind == 'update':
+        fields = {key: op[key] for key in DETAIL_FIELDS if key in op}
+        update_tasks(task_manager, [task_id], op.get('status'), fields)
+        return {'id': task_id}
+    if kind == 'remove':
+        if not task_manager.remove_tasks([task_id]):
+            raise ValueError(f"Task {task_id} not found")
+        return {'id': task_id}
+    if kind == 'get':
+        task = task_manager.get_task_by_id(task_id)
+        if task is None:
+            raise ValueError(f"Task {task_id} not found")
+        return {'task': dict(task)}
+    raise ValueError(f"Unknown operation {kind!r}")
+
+
+def run_batch(task_manager, lines, out, chunk_size=1000):
+    """Apply newline-delimited JSON operations from ``lines``, writing one result line each.
+
+    Every ``chunk_size`` operations are applied in one ``batch()``, so each
+    chunk is persisted with a single write, and its results are written once
+    it is saved.  Only one chunk is held at a time, however long the input.
+    Returns the number of operations that failed.
+    """
+    failed = 0
+    chunk = []
+    for number, line in enumerate(lines, 1):
+        if line.strip():
+            chunk.append((number, line))
+        if len(chunk) >= chunk_size:
+            failed += _apply_chunk(task_manager, chunk, out)
+            chunk = []
+    if chunk:
+        failed += _apply_chunk(task_manager, chunk, out)
+    return failed
+
+
+def _apply_chunk(task_manager, chunk, out):
+    results = []
+    failed = 0
+    with task_manager.batch():
+        for number, line in chunk:
+            try:
+                result = {'line': number, 'ok': True}
+                result.update(apply_operation(task_manager, json.loads(line)))
+            except (ValueError, TypeError, KeyError) as e:
+                # One bad operation must not cost the rest of the run.
+                result = {'line': number, 'ok': False, 'error': str(e)}
+                failed += 1
+            results.append(result)
+    out.write(''.join(json.dumps(result) + '\n' for result in results))
+    out.flush()
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--config', default='config.json', help="settings file (default config.json)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="add a TO DO task and print its id")
+    add.add_argument('name')
+    add.add_argument('priority')
+    add.add_argument('due_date', help="mm-dd-yyyy")
+
+    show = commands.add_parser('list', help="print tasks, one per line")
+    show.add_argument('--status', action='append', help="only this status (repeatable)")
+    show.add_argument('--json', action='store_true', help="print JSON Lines instead of tab-separated columns")
+
+    query = commands.add_parser('query', help="print tasks matching search box text")
+    query.add_argument('text', help="e.g. 'priority:High due<12-31-2025' or 'report/draft'")
+    query.add_argument('--json', action='store_true', help="print JSON Lines instead of tab-separated columns")
+
+    update = commands.add_parser('update', help="change the status or details of tasks")
+    update.add_argument('ids', type=int, nargs='+')
+    update.add_argument('--status')
+    update.add_argument('--name')
+    update.add_argument('--priority')
+    update.add_argument('--due', dest='due_date', help="mm-dd-yyyy")
+
+    remove = commands.add_parser('remove', help="delete tasks")
+    remove.add_argument('ids', type=int, nargs='+')
+
+    import_cmd = commands.add_parser('import', help="add the tasks of an exported CSV file")
+    import_cmd.add_argument('file')
+
+    export = commands.add_parser('export', help="write tasks as CSV or JSON Lines (.gz to compress)")
+    export.add_argument('file')
+    export.add_argument('--query', help="only tasks matching this search box text")
+
+    batch = commands.add_parser('batch', help="apply JSON Lines operations from stdin")
+    batch.add_argument('--chunk-size', type=int, default=1000, help="operations per write (default 1000)")
+
+    args = parser.parse_args(argv)
+    task_manager = open_task_manager(args.config)
+    try:
+        return run_command(task_manager, args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        task_manager.close()
+
+
+def run_command(task_manager, args):
+    if args.command == 'add':
+        print(add_task(task_manager, args.name, args.priority, args.due_date))
+    elif args.command == 'list':
+        tasks = task_manager.export_source({'status': args.status} if args.status else None)
+        write_tasks(tasks, sys.stdout, args.json)
+    elif args.command == 'query':
+        write_tasks(matching_tasks(task_manager, args.text), sys.stdout, args.json)
+    elif args.command == 'update':
+        fields = {key: getattr(args, key) for key in DETAIL_FIELDS if getattr(args, key) is not None}
+        print(f"Updated {update_tasks(task_manager, args.ids, args.status, fields)} tasks")
+    elif args.command == 'remove':
+        print(f"Removed {task_manager.remove_tasks(args.ids)} tasks")
+    elif args.command == 'import':
+        report = task_manager.import_tasks(args.file)
+        print(report.summary() if report.error is None else report.error)
+        return 0 if report else 1
+    elif args.command == 'export':
+        tasks = matching_tasks(task_manager, args.query)
+        if task_manager.export_tasks(args.file, tasks=tasks) is None:
+            return 1
+        print(f"Exported {len(tasks)} tasks to {args.file}")
+    elif args.command == 'batch':
+        if run_batch(task_manager, sys.stdin, sys.stdout, args.chunk_size):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
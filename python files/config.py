@@ -0,0 +1,56 @@
+import json
+import os
+
+from storage import BackgroundStorage, JsonFileStorage, JournalStorage
+from task_archive import TaskArchive
+
+DEFAULTS = {
+    'storage': 'journal',
+    'tasks_file': 'tasks.json',
+    'database': 'tasks.db',
+    'virtual_lists': True,
+    'snapshot_cache': True,
+    'background_writes': False,
+    'write_delay': 0.5,
+    'poll_interval': 2.0,
+    'upcoming_days': 1,
+    'archive_after_days': 0,
+    'undo_memory_mb': 16,
+}
+
+
+def load_config(filename='config.json'):
+    """Read settings from ``config.json``; ``TASK_MANAGER_STORAGE`` overrides the backend."""
+    config = dict(DEFAULTS)
+    if os.path.exists(filename):
+        try:
+            with open(filename, 'r') as f:
+                config.update(json.load(f))
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error loading config: {e}")
+    if os.environ.get('TASK_MANAGER_STORAGE'):
+        config['storage'] = os.environ['TASK_MANAGER_STORAGE']
+    return config
+
+
+def open_archive(config):
+    base = config['database'] if config['storage'] == 'sqlite' else config['tasks_file']
+    return TaskArchive(base + '.archive')
+
+
+def open_storage(config):
+    backend = config['storage']
+    if backend in ('json', 'journal'):
+        if backend == 'json':
+            storage = JsonFileStorage(config['tasks_file'], cache=config['snapshot_cache'])
+        else:
+            storage = JournalStorage(config['tasks_file'], cache=config['snapshot_cache'])
+        if config['background_writes']:
+            storage = BackgroundStorage(storage, config['write_delay'])
+        return storage
+    if backend == 'sqlite':
+        from sqlite_storage import SqliteStorage, migrate_from_json
+        if not os.path.exists(config['database']) and os.path.exists(config['tasks_file']):
+            migrate_from_json(config['tasks_file'], config['database'])
+        return SqliteStorage(config['database'])
+    raise ValueError(f"Unknown storage backend '{backend}'")
@@ -0,0 +1,90 @@
+import csv
+import os
+
+from task_model import Task
+
+
+class ImportReport:
+    """Outcome of a CSV import.
+
+    Row problems are collected in ``errors`` as ``(line, message)`` pairs and
+    ids that already existed in ``duplicates``.  ``error`` is set when the
+    file itself could not be read.  The report is truthy when the file was
+    read to the end, so ``if task_manager.import_tasks(...)`` keeps working.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.rows_read = 0
+        self.imported = 0
+        self.duplicates = []
+        self.errors = []
+        self.error = None
+        self.cancelled = False
+
+    def __bool__(self):
+        return self.error is None and not self.cancelled
+
+    def summary(self):
+        lines = [f"Imported {self.imported} of {self.rows_read} rows from {self.filename}."]
+        if self.duplicates:
+            lines.append(f"Skipped {len(self.duplicates)} tasks whose ID already exists.")
+        if self.errors:
+            lines.append(f"Skipped {len(self.errors)} rows that could not be parsed, e.g.")
+            lines.extend(f"  line {line}: {message}" for line, message in self.errors[:5])
+        return "\n".join(lines)
+
+
+def _counting(lines, counter):
+    for line in lines:
+        counter[0] += len(line)
+        yield line
+
+
+def read_csv_tasks(filename, report, chunk_size=1000, progress=None, cancelled=None):
+    """Yield lists of up to ``chunk_size`` parsed tasks from an exported CSV file.
+
+    Rows repeating an id seen earlier in the file are recorded as duplicates.
+    ``progress(done, total)`` is called after every chunk with character
+    counts, and the read stops early once ``cancelled()`` returns True.
+    """
+    if not os.path.exists(filename):
+        report.error = f"File '{filename}' not found."
+        return
+    total = os.path.getsize(filename)
+    consumed = [0]
+    seen = set()
+    chunk = []
+    try:
+        with open(filename, 'r', newline='') as f:
+            reader = csv.DictReader(_counting(f, consumed))
+            for row in reader:
+                report.rows_read += 1
+                try:
+                    task = Task(int(row['ID']), row['Name'], row['Priority'], row['Due Date'],
+                                row['Status'])
+                    if None in (task.name, task.priority, task.due_date, task.status):
+                        raise ValueError("row has too few columns")
+                except (KeyError, TypeError, ValueError) as e:
+                    report.errors.append((reader.line_num, str(e)))
+                    continue
+                if task.id in seen:
+                    report.duplicates.append(task.id)
+                    continue
+                seen.add(task.id)
+                chunk.append(task)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+                    if progress is not None:
+                        progress(consumed[0], total)
+                    if cancelled is not None and cancelled():
+                        report.cancelled = True
+                        return
+    except (IOError, csv.Error, UnicodeDecodeError) as e:
+        report.error = f"Error importing tasks: {e}"
+        return
+    if chunk:
+        yield chunk
+    if progress is not None:
+        progress(total, total)
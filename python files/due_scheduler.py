@@ -0,0 +1,184 @@
+import heapq
+import time
+from datetime import date, datetime
+from functools import lru_cache
+
+from task_query import due_key
+
+UPCOMING = 'upcoming'
+OVERDUE = 'overdue'
+CLOSED_STATUSES = ('completed',)
+# Longest single sleep; waking now and then absorbs clock changes and suspends.
+MAX_WAIT = 3600
+
+
+@lru_cache(maxsize=4096)
+def midnight(day):
+    """Local timestamp at the start of day number ``day``."""
+    return datetime.combine(date.fromordinal(day), datetime.min.time()).timestamp()
+
+
+class DueScheduler:
+    """Calls ``on_due(kind, task_ids)`` when open tasks come due.
+
+    A task is 'upcoming' from midnight ``upcoming_days`` before its due date
+    and 'overdue' from the midnight after it.  ``start()`` reports the tasks
+    already in either state once; after that each task is reported as the
+    clock crosses its thresholds.
+
+    Future reminders sit in a min-heap of ``(time, task_id, kind)``.  Edits
+    do not search the heap: the current reminder of each task is kept in
+    ``scheduled`` and heap entries that no longer match it are skipped when
+    they surface (and dropped in bulk once they outnumber the live ones).
+    Waiting goes through ``after(ms, callback)``/``after_cancel(job)``, armed
+    only for the earliest reminder, and ``clock()`` gives the time; both can
+    be swapped for fakes.
+    """
+
+    def __init__(self, task_manager, on_due, after, after_cancel, clock=time.time, upcoming_days=1):
+        self.task_manager = task_manager
+        self.on_due = on_due
+        self.after = after
+        self.after_cancel = after_cancel
+        self.clock = clock
+        self.upcoming_days = upcoming_days
+        self.heap = []
+        self.scheduled = {}
+        self.job = None
+        self.wake_at = None
+        self.started = False
+
+    def start(self, report=True):
+        """Schedule every open task, reporting those already upcoming or overdue."""
+        if not self.started:
+            self.task_manager.subscribe(self.on_tasks_changed)
+            self.started = True
+        now = self.clock()
+        due = {UPCOMING: [], OVERDUE: []}
+        self.heap = []
+        self.scheduled = {}
+        # Reminders depend only on status and due date, and far fewer pairs
+        # than tasks exist, so each pair is worked out once.
+        plans = {}
+        for task in self.task_manager.tasks:
+            key = (task['status'], task['due_date'])
+            plan = plans.get(key)
+            if plan is None:
+                plan = plans[key] = (self._state(task, now), self._next_event(task, now))
+            kind, event = plan
+            if kind is not None:
+                due[kind].append(task['id'])
+            if event is not None:
+                self.scheduled[task['id']] = event
+                self.heap.append((event[0], task['id'], event[1]))
+        heapq.heapify(self.heap)
+        self._arm()
+        if report:
+            for kind in (OVERDUE, UPCOMING):
+                if due[kind]:
+                    self.on_due(kind, due[kind])
+
+    def stop(self):
+        if self.started:
+            self.task_manager.unsubscribe(self.on_tasks_changed)
+            self.started = False
+        if self.job is not None:
+            self.after_cancel(self.job)
+            self.job = None
+            self.wake_at = None
+
+    def _due_day(self, task):
+        if task is None or str(task['status']).lower() in CLOSED_STATUSES:
+            return None
+        return due_key(task['due_date'])
+
+    def _state(self, task, now):
+        """The reminder ``task`` is already past at ``now``, if any."""
+        day = self._due_day(task)
+        if day is None:
+            return None
+        if now >= midnight(day + 1):
+            return OVERDUE
+        if now >= midnight(day - self.upcoming_days):
+            return UPCOMING
+        return None
+
+    def _next_event(self, task, now):
+        """``(time, kind)`` of the next reminder after ``now``, or None."""
+        day = self._due_day(task)
+        if day is None:
+            return None
+        upcoming_at = midnight(day - self.upcoming_days)
+        if now < upcoming_at:
+            return upcoming_at, UPCOMING
+        overdue_at = midnight(day + 1)
+        if now < overdue_at:
+            return overdue_at, OVERDUE
+        return None
+
+    def on_tasks_changed(self, kind, task_ids):
+        if kind == 'reset':
+            # A reset is a reload, not news; only reminders from now on count.
+            self.start(report=False)
+            return
+        now = self.clock()
+        get_task = self.task_manager.get_task_by_id
+        for task_id in task_ids:
+            event = None if kind == 'removed' else self._next_event(get_task(task_id), now)
+            if event == self.scheduled.get(task_id):
+                continue
+            if event is None:
+                del self.scheduled[task_id]
+            else:
+                self.scheduled[task_id] = event
+                heapq.heappush(self.heap, (event[0], task_id, event[1]))
+        if len(self.heap) > 2 * len(self.scheduled) + 64:
+            self.heap = [(when, task_id, kind) for task_id, (when, kind) in self.scheduled.items()]
+            heapq.heapify(self.heap)
+        self._arm()
+
+    def _live(self, entry):
+        when, task_id, kind = entry
+        return self.scheduled.get(task_id) == (when, kind)
+
+    def _arm(self):
+        heap = self.heap
+        while heap and not self._live(heap[0]):
+            heapq.heappop(heap)
+        wake_at = heap[0][0] if heap else None
+        if wake_at == self.wake_at:
+            return
+        if self.job is not None:
+            self.after_cancel(self.job)
+            self.job = None
+        self.wake_at = wake_at
+        if wake_at is not None:
+            delay = min(max(wake_at - self.clock(), 0), MAX_WAIT)
+            self.job = self.after(int(delay * 1000) + 1, self.run_due)
+
+    def run_due(self):
+        """Report every reminder whose time has come and sleep until the next one."""
+        self.job = None
+        self.wake_at = None
+        now = self.clock()
+        due = {UPCOMING: [], OVERDUE: []}
+        get_task = self.task_manager.get_task_by_id
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if not self._live(entry):
+                continue
+            _, task_id, kind = entry
+            task = get_task(task_id)
+            # After a long sleep an upcoming reminder may already be overdue.
+            due[self._state(task, now) or kind].append(task_id)
+            event = self._next_event(task, now)
+            if event is None:
+                del self.scheduled[task_id]
+            else:
+                self.scheduled[task_id] = event
+                heapq.heappush(heap, (event[0], task_id, event[1]))
+        self._arm()
+        for kind in (OVERDUE, UPCOMING):
+            if due[kind]:
+                self.on_due(kind, due[kind])
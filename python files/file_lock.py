@@ -0,0 +1,80 @@
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+class FileLock:
+    """Advisory lock on ``<path>.lock`` shared by every process using ``path``.
+
+    Uses ``flock`` on POSIX and ``msvcrt.locking`` on Windows; elsewhere it
+    only serializes the threads of this process.  The lock is re-entrant, so
+    a locked method may call another one that locks again.
+
+    The lock file also holds a write counter.  Writers ``bump_version()``
+    while locked, so a reader can tell whether anything was written since it
+    last looked even when file sizes and mtimes happen to match.
+    """
+
+    def __init__(self, path):
+        self.filename = path + '.lock'
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                if self._file is None:
+                    self._file = open(self.filename, 'a+b')
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+                elif msvcrt is not None:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        try:
+            if self._depth == 0:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._thread_lock.release()
+
+    def close(self):
+        with self._thread_lock:
+            if self._file is not None and self._depth == 0:
+                self._file.close()
+                self._file = None
+
+    def version(self):
+        """The write counter; only meaningful while the lock is held."""
+        self._file.seek(0)
+        try:
+            return int(self._file.read() or 0)
+        except ValueError:
+            return 0
+
+    def bump_version(self):
+        version = self.version() + 1
+        self._file.truncate(0)
+        self._file.write(str(version).encode())
+        self._file.flush()
+        return version
@@ -0,0 +1,105 @@
+class SequenceAllocator:
+    """Hands out increasing ids, reserving them in blocks.
+
+    Only the end of the reserved block is persisted, so the state file is
+    rewritten once per ``block`` allocations rather than on every add.  After a
+    restart allocation resumes past the reserved block, which keeps ids of
+    deleted tasks from being reused.
+    """
+
+    kind = 'sequence'
+
+    def __init__(self, start=1, block=1000, reserved=0):
+        self.block = block
+        self.next_id = max(start, reserved)
+        self.reserved = reserved
+        self.dirty = False
+
+    def observe(self, task_id):
+        if task_id >= self.next_id:
+            self.next_id = task_id + 1
+
+    def release(self, task_id):
+        pass
+
+    def reconcile(self, state):
+        """Step past a block another instance reserved in the saved ``state``.
+
+        Call after ``allocate`` left the allocator dirty.  Returns the id to
+        use instead of the one just handed out, or None if it is still free.
+        """
+        if not state or state.get('kind') != self.kind:
+            return None
+        theirs = state.get('reserved', 0)
+        if theirs < self.next_id:
+            return None
+        self.next_id = theirs
+        return self.allocate()
+
+    def allocate(self):
+        task_id = self.next_id
+        self.next_id += 1
+        if self.next_id > self.reserved:
+            self.reserved = self.next_id + self.block
+            self.dirty = True
+        return task_id
+
+    def state(self):
+        return {'kind': self.kind, 'reserved': self.reserved, 'block': self.block}
+
+
+class RangeAllocator:
+    """Hands out ids from a fixed range using a bitmap and a free list.
+
+    Released ids are pushed on a free list and reused first; otherwise a
+    cursor walks the bitmap, so each slot is scanned at most once between
+    releases.
+    """
+
+    kind = 'range'
+
+    def __init__(self, low=1735, high=8025):
+        self.low = low
+        self.high = high
+        self.used = bytearray(high - low + 1)
+        self.free = []
+        self.cursor = 0
+        self.dirty = True
+
+    def observe(self, task_id):
+        if self.low <= task_id <= self.high:
+            self.used[task_id - self.low] = 1
+
+    def release(self, task_id):
+        if self.low <= task_id <= self.high and self.used[task_id - self.low]:
+            self.used[task_id - self.low] = 0
+            self.free.append(task_id)
+
+    def reconcile(self, state):
+        # Range ids are reused locally; other instances' ids arrive through observe().
+        return None
+
+    def allocate(self):
+        while self.free:
+            task_id = self.free.pop()
+            if not self.used[task_id - self.low]:
+                self.used[task_id - self.low] = 1
+                return task_id
+        while self.cursor < len(self.used):
+            slot = self.cursor
+            self.cursor += 1
+            if not self.used[slot]:
+                self.used[slot] = 1
+                return self.low + slot
+        raise RuntimeError(f"No free task ids left between {self.low} and {self.high}")
+
+    def state(self):
+        return {'kind': self.kind, 'low': self.low, 'high': self.high}
+
+
+def allocator_from_state(state):
+    if not state:
+        return SequenceAllocator()
+    if state.get('kind') == RangeAllocator.kind:
+        return RangeAllocator(state['low'], state['high'])
+    return SequenceAllocator(reserved=state.get('reserved', 0), block=state.get('block', 1000))
@@ -0,0 +1,135 @@
+import cProfile
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket i counts calls that took less than 2**i microseconds.
+BUCKETS = 32
+
+
+class OpStats:
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * BUCKETS
+
+    def add(self, elapsed):
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        self.histogram[min(int(elapsed * 1e6).bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the histogram bucket holding the given fraction of calls, in seconds."""
+        wanted = fraction * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= wanted:
+                return min(2 ** bucket / 1e6, self.max)
+        return self.max
+
+
+class Stats:
+    """Opt-in counters for timed operations and bytes written.
+
+    Timing is off until ``enable()`` (or ``TASK_MANAGER_STATS=1``); while off
+    a ``timed`` function costs one attribute check per call.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.ops = {}
+        self.bytes_written = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.ops = {}
+            self.bytes_written = {}
+
+    def record(self, name, elapsed):
+        with self._lock:
+            op = self.ops.get(name)
+            if op is None:
+                op = self.ops[name] = OpStats()
+            op.add(elapsed)
+
+    def add_bytes(self, name, count):
+        if self.enabled:
+            with self._lock:
+                self.bytes_written[name] = self.bytes_written.get(name, 0) + count
+
+    @contextmanager
+    def timer(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Plain-dict copy of every counter, safe to keep or serialize."""
+        with self._lock:
+            ops = {name: {'calls': op.calls,
+                          'total_ms': op.total * 1e3,
+                          'mean_ms': op.total / op.calls * 1e3,
+                          'p50_ms': op.percentile(0.50) * 1e3,
+                          'p95_ms': op.percentile(0.95) * 1e3,
+                          'max_ms': op.max * 1e3,
+                          'histogram': list(op.histogram)}
+                   for name, op in self.ops.items()}
+            return {'enabled': self.enabled, 'ops': ops, 'bytes_written': dict(self.bytes_written)}
+
+
+STATS = Stats(enabled=os.environ.get('TASK_MANAGER_STATS', '') not in ('', '0'))
+
+
+def timed(name):
+    """Decorator recording each call of the function under ``name`` in ``STATS``."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not STATS.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STATS.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def start_profile():
+    """Start cProfile if ``TASK_MANAGER_PROFILE`` names an output file."""
+    filename = os.environ.get('TASK_MANAGER_PROFILE')
+    if not filename:
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def stop_profile(profiler):
+    """Stop a profiler from ``start_profile`` and write it out for ``pstats``."""
+    if profiler is None:
+        return
+    profiler.disable()
+    try:
+        profiler.dump_stats(os.environ['TASK_MANAGER_PROFILE'])
+    except IOError as e:
+        print(f"Error writing profile: {e}")
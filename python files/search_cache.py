@@ -0,0 +1,45 @@
+from collections import OrderedDict
+
+from task_query import narrows
+
+
+class SearchCache:
+    """Recent search results, evicting the least recently used.
+
+    Entries are keyed by the search terms and the data version they were
+    computed at.  Results from older versions can never be hit again, so
+    they are dropped as soon as the version moves on.
+    """
+
+    def __init__(self, size=32):
+        self.size = size
+        self.version = None
+        self.entries = OrderedDict()
+
+    def _use_version(self, version):
+        if version != self.version:
+            self.entries.clear()
+            self.version = version
+
+    def get(self, terms, version):
+        self._use_version(version)
+        results = self.entries.get(terms)
+        if results is not None:
+            self.entries.move_to_end(terms)
+        return results
+
+    def put(self, terms, version, results):
+        self._use_version(version)
+        self.entries[terms] = results
+        self.entries.move_to_end(terms)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def narrowing_base(self, terms, version):
+        """The smallest cached result that holds every match for ``terms``, or None."""
+        self._use_version(version)
+        best = None
+        for cached_terms, results in self.entries.items():
+            if narrows(cached_terms, terms) and (best is None or len(results) < len(best)):
+                best = results
+        return best
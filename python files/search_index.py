@@ -0,0 +1,268 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from operator import attrgetter
+
+INFINITY = float('inf')
+
+
+class NgramIndex:
+    """Inverted index from character n-grams of task ids and names to task ids.
+
+    A term of ``n`` or more characters is looked up by intersecting the
+    posting sets of its n-grams; shorter terms union the postings of every
+    indexed gram that contains them.  Either way the result is only a
+    candidate set and callers confirm each hit with a plain substring check.
+
+    Building the index is the slowest part of loading, so ``defer`` can queue
+    task ids to be indexed later, a slice at a time, by ``index_pending``.
+    Until the backlog is empty the postings are incomplete.
+    """
+
+    fields = ('id', 'name')
+
+    def __init__(self, n=3):
+        self.n = n
+        self.postings = {}
+        self.backlog = []
+        self.backlog_pos = 0
+
+    def _grams(self, task):
+        n = self.n
+        grams = set()
+        for text in (str(task['id']).lower(), task['name'].lower()):
+            if len(text) < n:
+                if text:
+                    grams.add(text)
+            else:
+                grams.update(text[i:i + n] for i in range(len(text) - n + 1))
+        return grams
+
+    def clear(self):
+        self.postings = {}
+        self.backlog = []
+        self.backlog_pos = 0
+
+    def defer(self, task_ids):
+        self.clear()
+        self.backlog = list(task_ids)
+
+    def index_pending(self, get_task, limit=None):
+        """Index up to ``limit`` deferred tasks; return True once none are left.
+
+        Ids are looked up through ``get_task`` so tasks edited or removed
+        since ``defer`` are indexed as they are now, or skipped.
+        """
+        total = len(self.backlog)
+        end = total if limit is None else min(total, self.backlog_pos + limit)
+        for task_id in self.backlog[self.backlog_pos:end]:
+            task = get_task(task_id)
+            if task is not None:
+                self.add(task)
+        self.backlog_pos = end
+        if end >= total:
+            self.backlog = []
+            self.backlog_pos = 0
+            return True
+        return False
+
+    def add(self, task):
+        task_id = task['id']
+        postings = self.postings
+        for gram in self._grams(task):
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = {task_id}
+            else:
+                ids.add(task_id)
+
+    def discard(self, task):
+        task_id = task['id']
+        postings = self.postings
+        for gram in self._grams(task):
+            ids = postings.get(gram)
+            if ids is not None:
+                ids.discard(task_id)
+                if not ids:
+                    del postings[gram]
+
+    def candidates(self, term):
+        n = self.n
+        if len(term) >= n:
+            posting_sets = sorted((self.postings.get(term[i:i + n], ())
+                                   for i in range(len(term) - n + 1)), key=len)
+            result = set(posting_sets[0])
+            for ids in posting_sets[1:]:
+                if not result:
+                    break
+                result.intersection_update(ids)
+            return result
+        result = set()
+        for gram, ids in self.postings.items():
+            if term in gram:
+                result.update(ids)
+        return result
+
+
+class BucketIndex:
+    """Groups task ids by the exact value of one low-cardinality field."""
+
+    def __init__(self, field):
+        self.field = field
+        self.fields = (field,)
+        self.buckets = {}
+
+    def clear(self):
+        self.buckets = {}
+
+    def add(self, task):
+        self.buckets.setdefault(task[self.field], {})[task['id']] = task
+
+    def discard(self, task):
+        bucket = self.buckets.get(task[self.field])
+        if bucket is not None:
+            bucket.pop(task['id'], None)
+            if not bucket:
+                del self.buckets[task[self.field]]
+
+    def matching(self, values):
+        """Buckets whose key equals one of ``values``, ignoring case."""
+        wanted = {value.lower() for value in values}
+        return [bucket for key, bucket in self.buckets.items() if str(key).lower() in wanted]
+
+
+class SortedIndex:
+    """Keeps ``(key(task), id)`` pairs sorted so ranges can be bisected.
+
+    Tasks whose key is ``None`` are left out of the index.
+    """
+
+    def __init__(self, field, key):
+        self.field = field
+        self.fields = (field,)
+        self.key = key
+        self.entries = []
+
+    def clear(self):
+        self.entries = []
+
+    def rebuild(self, tasks):
+        key = self.key
+        field = self.field
+        entries = [(key(task[field]), task['id']) for task in tasks]
+        self.entries = sorted(entry for entry in entries if entry[0] is not None)
+
+    def add(self, task):
+        value = self.key(task[self.field])
+        if value is not None:
+            insort(self.entries, (value, task['id']))
+
+    def discard(self, task):
+        value = self.key(task[self.field])
+        if value is None:
+            return
+        entry = (value, task['id'])
+        i = bisect_left(self.entries, entry)
+        if i < len(self.entries) and self.entries[i] == entry:
+            del self.entries[i]
+
+    def _bounds(self, low, high):
+        start = 0 if low is None else bisect_left(self.entries, (low,))
+        end = len(self.entries) if high is None else bisect_right(self.entries, (high, INFINITY))
+        return start, end
+
+    def count_range(self, low=None, high=None):
+        start, end = self._bounds(low, high)
+        return max(end - start, 0)
+
+    def ids_in_range(self, low=None, high=None):
+        """Ids whose key lies in the inclusive range ``low``..``high``."""
+        start, end = self._bounds(low, high)
+        return [task_id for _, task_id in self.entries[start:end]]
+
+
+class CountIndex:
+    """Running task totals, so summaries never have to look at the tasks.
+
+    ``totals`` counts tasks per ``(status, priority)`` pair and
+    ``open_by_day`` counts the tasks not in ``closed_statuses`` per due day
+    (from ``day_key``).  ``overdue`` and ``due_soon`` are kept up to date
+    relative to ``today``: tasks due before it, and tasks due on it or in
+    the ``soon_days`` - 1 days after.  Moving ``today`` recomputes them from
+    ``open_by_day``, which has one entry per distinct day, not per task.
+    """
+
+    fields = ('status', 'priority', 'due_date')
+
+    def __init__(self, day_key, today, closed_statuses=('completed',), soon_days=7):
+        self.day_key = day_key
+        self.closed_statuses = set(closed_statuses)
+        self.soon_days = soon_days
+        self.today = today
+        self.clear()
+
+    def clear(self):
+        self.totals = {}
+        self.open_by_day = {}
+        self.overdue = 0
+        self.due_soon = 0
+
+    def rebuild(self, tasks):
+        # Store tasks are Task objects; attribute access keeps a bulk load cheap.
+        self.clear()
+        for (status, priority, due_date), count in Counter(map(attrgetter(*self.fields), tasks)).items():
+            self.tally(status, priority, due_date, count)
+
+    def add(self, task):
+        self.tally(task['status'], task['priority'], task['due_date'], 1)
+
+    def discard(self, task):
+        self.tally(task['status'], task['priority'], task['due_date'], -1)
+
+    def tally(self, status, priority, due_date, count):
+        """Add ``count`` tasks with these fields (negative to remove them)."""
+        pair = (status, priority)
+        total = self.totals.get(pair, 0) + count
+        if total:
+            self.totals[pair] = total
+        else:
+            self.totals.pop(pair, None)
+        if str(status).lower() in self.closed_statuses:
+            return
+        day = self.day_key(due_date)
+        if day is None:
+            return
+        remaining = self.open_by_day.get(day, 0) + count
+        if remaining:
+            self.open_by_day[day] = remaining
+        else:
+            self.open_by_day.pop(day, None)
+        if day < self.today:
+            self.overdue += count
+        elif day < self.today + self.soon_days:
+            self.due_soon += count
+
+    def set_today(self, today):
+        if today == self.today:
+            return
+        self.today = today
+        end = today + self.soon_days
+        self.overdue = sum(count for day, count in self.open_by_day.items() if day < today)
+        self.due_soon = sum(count for day, count in self.open_by_day.items() if today <= day < end)
+
+    def summary(self):
+        """The counters as plain dicts, for display or reporting."""
+        by_status = {}
+        by_priority = {}
+        open_by_priority = {}
+        for (status, priority), count in self.totals.items():
+            by_status[status] = by_status.get(status, 0) + count
+            by_priority[priority] = by_priority.get(priority, 0) + count
+            if str(status).lower() not in self.closed_statuses:
+                open_by_priority[priority] = open_by_priority.get(priority, 0) + count
+        return {'total': sum(by_status.values()),
+                'by_status': by_status,
+                'by_priority': by_priority,
+                'open_by_priority': open_by_priority,
+                'by_status_priority': dict(self.totals),
+                'overdue': self.overdue,
+                'due_this_week': self.due_soon}
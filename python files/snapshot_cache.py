@@ -0,0 +1,51 @@
+import marshal
+import os
+
+from task_model import Task
+
+CACHE_VERSION = 2
+
+
+def cache_filename(filename):
+    return filename + '.cache'
+
+
+def _signature(filename):
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+def read_cache(filename):
+    """Tasks from the binary cache next to ``filename``, or None if it is missing or stale.
+
+    The cache records the size, mtime and inode of the file it was built
+    from, so any rewrite of ``filename`` invalidates it.
+    """
+    try:
+        with open(cache_filename(filename), 'rb') as f:
+            version, signature, rows = marshal.loads(f.read())
+        if version != CACHE_VERSION or signature != _signature(filename):
+            return None
+        return [Task(*row) for row in rows]
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def write_cache(filename, tasks):
+    """Store ``tasks`` as a marshal file tied to the current state of ``filename``.
+
+    The cache is only an accelerator, so failures are ignored.
+    """
+    cache_name = cache_filename(filename)
+    tmp_name = f"{cache_name}.{os.getpid()}.tmp"
+    try:
+        rows = []
+        for task in tasks:
+            task = Task.from_mapping(task)
+            rows.append((task.id, task.name, task.priority, task.due_date, task.status, task.extra))
+        with open(tmp_name, 'wb') as f:
+            f.write(marshal.dumps((CACHE_VERSION, _signature(filename), rows)))
+        os.replace(tmp_name, cache_name)
+    except (OSError, KeyError, TypeError, ValueError):
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
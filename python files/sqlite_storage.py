@@ -0,0 +1,396 @@
+import json
+import os
+import sqlite3
+import sys
+from contextlib import nullcontext
+from datetime import date
+
+from search_index import CountIndex
+from storage import JournalStorage
+from task_query import PRIORITY_RANKS, STATUS_RANKS, due_key
+
+COLUMNS = ('id', 'name', 'priority', 'due_date', 'status')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    priority TEXT COLLATE NOCASE,
+    due_date TEXT,
+    due_day INTEGER,
+    status TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority);
+CREATE INDEX IF NOT EXISTS tasks_due_day ON tasks (due_day);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# Trigram full-text index over id and name, kept in sync by triggers.  It
+# needs SQLite 3.34+; older libraries fall back to scanning names.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(id_text, name, tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts (rowid, id_text, name) VALUES (new.id, new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    DELETE FROM tasks_fts WHERE rowid = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF name ON tasks BEGIN
+    UPDATE tasks_fts SET name = new.name WHERE rowid = old.id;
+END;
+"""
+
+SELECT = "SELECT id, name, priority, due_date, status FROM tasks"
+
+
+def _lower(value):
+    return None if value is None else str(value).lower()
+
+
+def connect(filename):
+    """Open ``filename`` with ``py_lower()``, Python's ``str.lower`` as SQL.
+
+    SQLite's own ``lower()`` and ``LIKE`` only fold ASCII letters; matching
+    and sorting through ``py_lower()`` agree with the in-memory stores for
+    any name.
+    """
+    conn = sqlite3.connect(filename)
+    conn.create_function('py_lower', 1, _lower, deterministic=True)
+    return conn
+
+
+def _rank_sql(column, ranks):
+    cases = ' '.join(f"WHEN '{value}' THEN {rank}" for value, rank in ranks.items())
+    return f"CASE py_lower({column}) {cases} ELSE {len(ranks)} END, py_lower({column})"
+
+
+# ORDER BY clauses matching task_query.SORT_KEYS.
+SORT_SQL = {
+    'id': "id",
+    'name': "py_lower(name), id",
+    'priority': _rank_sql('priority', PRIORITY_RANKS) + ", id",
+    'due_date': "due_day IS NULL, due_day, id",
+    'status': _rank_sql('status', STATUS_RANKS) + ", id",
+}
+
+
+def _placeholders(values):
+    return ', '.join('?' * len(values))
+
+
+class SqliteStorage:
+    """Tasks kept in a local SQLite database instead of memory.
+
+    Unlike the JSON backends this storage is also the task store: reads such
+    as ``get``, ``with_status``, ``search`` and ``query`` run as indexed SQL, and
+    mutations are written straight to the database inside a transaction that
+    ``record`` commits.  As with the JSON backends, write failures go to
+    ``on_error(message)`` when it is set and are printed otherwise; a failed
+    commit leaves the transaction open for the next one to retry.
+    """
+
+    def __init__(self, filename='tasks.db'):
+        self.filename = filename
+        self.on_error = None
+        self.conn = connect(filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+        self._statuses = {row[0] for row in self.conn.execute("SELECT DISTINCT status FROM tasks")}
+        self.counts = CountIndex(due_key, date.today().toordinal())
+        self._load_counts()
+        self._data_version = self._read_data_version()
+
+    # Storage interface
+
+    def report_error(self, message):
+        if self.on_error is not None:
+            self.on_error(message)
+        else:
+            print(message)
+
+    def _commit(self):
+        try:
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.report_error(f"Error saving tasks: {e}")
+
+    def open_store(self):
+        return self
+
+    def load(self):
+        return self.values()
+
+    def save(self, tasks):
+        if tasks is not self:
+            try:
+                self.reset(tasks)
+            except sqlite3.Error as e:
+                self.report_error(f"Error saving tasks: {e}")
+                return
+        self._commit()
+
+    def record(self, ops, get_tasks):
+        self._commit()
+
+    def abort(self):
+        self.conn.rollback()
+
+    def flush(self):
+        self._commit()
+
+    def lock(self):
+        # SQLite does its own locking between connections.
+        return nullcontext()
+
+    def _read_data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll_changes(self, store):
+        """None if another connection committed since the last call, else no changes.
+
+        Reads already see other instances' rows; the caller only needs to
+        know the view is stale, and SQLite cannot say which rows changed.
+        """
+        version = self._read_data_version()
+        if version == self._data_version:
+            return []
+        self._data_version = version
+        self._statuses = {row[0] for row in self.conn.execute("SELECT DISTINCT status FROM tasks")}
+        self._load_counts()
+        return None
+
+    def load_meta(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'meta'").fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save_meta(self, meta):
+        try:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('meta', ?)",
+                              (json.dumps(meta),))
+        except sqlite3.Error as e:
+            self.report_error(f"Error saving task metadata: {e}")
+
+    def close(self):
+        self._commit()
+        self.conn.close()
+
+    # Store interface
+
+    def reset(self, tasks):
+        self.conn.execute("DELETE FROM tasks")
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO tasks (id, name, priority, due_date, due_day, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((task['id'], task['name'], task['priority'], task['due_date'],
+              due_key(task['due_date']), task['status']) for task in tasks))
+        self._statuses = {row[0] for row in self.conn.execute("SELECT DISTINCT status FROM tasks")}
+        self._load_counts()
+
+    def _load_counts(self):
+        self.counts.clear()
+        for status, priority, due_date, count in self.conn.execute(
+                "SELECT status, priority, due_date, COUNT(*) FROM tasks GROUP BY status, priority, due_date"):
+            self.counts.tally(status, priority, due_date, count)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def __iter__(self):
+        return iter(self.values())
+
+    def __contains__(self, task_id):
+        return self.conn.execute("SELECT 1 FROM tasks WHERE id = ?", (task_id,)).fetchone() is not None
+
+    def _rows(self, sql, params=()):
+        return [dict(zip(COLUMNS, row)) for row in self.conn.execute(sql, params)]
+
+    def values(self):
+        return self._rows(SELECT + " ORDER BY id")
+
+    def ids(self):
+        return [row[0] for row in self.conn.execute("SELECT id FROM tasks")]
+
+    def get(self, task_id):
+        rows = self._rows(SELECT + " WHERE id = ?", (task_id,))
+        return rows[0] if rows else None
+
+    def with_status(self, status):
+        return self._rows(SELECT + " WHERE status = ? ORDER BY id", (status,))
+
+    def count(self, status=None):
+        if status is None:
+            return len(self)
+        return self.conn.execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (status,)).fetchone()[0]
+
+    def insert(self, task):
+        old = self.get(task['id'])
+        if old is not None:
+            self.counts.discard(old)
+        # Delete first so the full-text triggers see the replaced row.
+        self.conn.execute("DELETE FROM tasks WHERE id = ?", (task['id'],))
+        self.conn.execute(
+            "INSERT INTO tasks (id, name, priority, due_date, due_day, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (task['id'], task['name'], task['priority'], task['due_date'],
+             due_key(task['due_date']), task['status']))
+        self._statuses.add(task['status'])
+        self.counts.add(task)
+
+    def update(self, task_id, fields):
+        old = self.get(task_id)
+        if old is None:
+            return None
+        fields = {key: value for key, value in fields.items() if key in COLUMNS and key != 'id'}
+        if 'due_date' in fields:
+            fields['due_day'] = due_key(fields['due_date'])
+        if fields:
+            assignments = ', '.join(f"{key} = ?" for key in fields)
+            self.conn.execute(f"UPDATE tasks SET {assignments} WHERE id = ?",
+                              (*fields.values(), task_id))
+            self.counts.discard(old)
+            self.counts.add(dict(old, **fields))
+        if 'status' in fields:
+            self._statuses.add(fields['status'])
+        return {key: old[key] for key in fields if key in old}
+
+    def delete(self, task_id):
+        task = self.get(task_id)
+        if task is not None:
+            self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            self.counts.discard(task)
+        return task
+
+    def summary(self, today):
+        self.counts.set_today(today)
+        return self.counts.summary()
+
+    def finish_indexing(self, limit=None):
+        return True
+
+    def sorted_ids(self, field, reverse=False):
+        ids = [row[0] for row in self.conn.execute(f"SELECT id FROM tasks ORDER BY {SORT_SQL[field]}")]
+        if reverse:
+            ids.reverse()
+        return ids
+
+    def _text_clause(self, term, columns):
+        if self.fts and len(term) >= 3:
+            phrase = '"' + term.replace('"', '""') + '"'
+            if columns == ('name',):
+                phrase = 'name : ' + phrase
+            return "id IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)", [phrase]
+        expressions = {'id': "instr(CAST(id AS TEXT), ?)", 'name': "instr(py_lower(name), ?)"}
+        return "(" + " OR ".join(expressions[c] for c in columns) + ")", [term.lower()] * len(columns)
+
+    def search(self, terms):
+        clauses = []
+        params = []
+        for term in terms:
+            if not term:
+                return self.values()
+            statuses = [status for status in self._statuses if term in status.lower()]
+            if statuses:
+                clauses.append(f"status IN ({_placeholders(statuses)})")
+                params.extend(statuses)
+            clause, clause_params = self._text_clause(term, ('id', 'name'))
+            clauses.append(clause)
+            params.extend(clause_params)
+        return self._rows(SELECT + " WHERE " + " OR ".join(clauses) + " ORDER BY id", params)
+
+    def iter_search(self, terms, chunk_size=None):
+        # One query; SQLite cannot hand back control part way through.
+        yield self.search(terms)
+
+    def query(self, **filters):
+        return self._rows(*self._query_sql(**filters))
+
+    def snapshot(self, **filters):
+        """Stream matching rows through a separate connection, for worker threads."""
+        sql, params = self._query_sql(**filters)
+        count_sql = "SELECT COUNT(*) FROM (" + sql.replace(SELECT, "SELECT id FROM tasks", 1) + ")"
+        count = self.conn.execute(count_sql, params).fetchone()[0]
+        return RowStream(self.filename, sql, params, count)
+
+    def _query_sql(self, status=None, priority=None, due_from=None, due_to=None, name=None,
+                   exclude_status=None):
+        clauses = []
+        params = []
+        for column, values, negate in (('status', status, False), ('priority', priority, False),
+                                       ('status', exclude_status, True)):
+            if values is not None:
+                operator = "NOT IN" if negate else "IN"
+                clauses.append(f"{column} {operator} ({_placeholders(values)})")
+                params.extend(values)
+        if due_from is not None:
+            clauses.append("due_day >= ?")
+            params.append(due_from)
+        if due_to is not None:
+            clauses.append("due_day <= ?")
+            params.append(due_to)
+        if name:
+            clause, clause_params = self._text_clause(name, ('name',))
+            clauses.append(clause)
+            params.extend(clause_params)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return SELECT + where + " ORDER BY id", params
+
+
+class RowStream:
+    """Iterable over a query that opens its own connection when iterated."""
+
+    def __init__(self, filename, sql, params, count):
+        self.filename = filename
+        self.sql = sql
+        self.params = params
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        conn = connect(self.filename)
+        try:
+            for row in conn.execute(self.sql, self.params):
+                yield dict(zip(COLUMNS, row))
+        finally:
+            conn.close()
+
+
+def migrate_from_json(json_filename='tasks.json', db_filename='tasks.db'):
+    """Copy tasks (including any unreplayed journal) into a new SQLite database.
+
+    Returns the number of tasks copied, or None when the database already
+    holds tasks and was left alone.
+    """
+    source = JournalStorage(json_filename)
+    storage = SqliteStorage(db_filename)
+    try:
+        if len(storage):
+            return None
+        tasks = source.load()
+        storage.reset(tasks)
+        meta = source.load_meta()
+        if meta:
+            storage.save_meta(meta)
+        storage.conn.commit()
+        return len(tasks)
+    finally:
+        storage.close()
+        source.close()
+
+
+if __name__ == '__main__':
+    json_filename = sys.argv[1] if len(sys.argv) > 1 else 'tasks.json'
+    db_filename = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(json_filename)[0] + '.db'
+    copied = migrate_from_json(json_filename, db_filename)
+    if copied is None:
+        print(f"{db_filename} already contains tasks; nothing migrated.")
+    else:
+        print(f"Migrated {copied} tasks from {json_filename} to {db_filename}")
@@ -0,0 +1,586 @@
+import json
+import os
+import threading
+import time
+
+from file_lock import FileLock
+from instrumentation import STATS
+from snapshot_cache import read_cache, write_cache
+from task_store import TaskStore
+
+
+def write_atomic(filename, data):
+    """Write ``data`` to ``filename`` through a temp file and an atomic rename."""
+    tmp_name = filename + '.tmp'
+    with open(tmp_name, 'w') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_name, filename)
+    STATS.add_bytes('storage.snapshot', len(data))
+
+
+def apply_op(tasks_by_id, op):
+    """Replay one journal record onto an id -> task mapping.
+
+    Records are idempotent so that a journal segment can safely be replayed
+    over a snapshot that already contains it.
+    """
+    kind = op.get('op')
+    if kind == 'add':
+        task = op['task']
+        tasks_by_id[task['id']] = task
+    elif kind == 'set':
+        task = tasks_by_id.get(op['id'])
+        if task is not None:
+            task.update(op['fields'])
+    elif kind == 'remove':
+        tasks_by_id.pop(op['id'], None)
+
+
+def file_signature(filename):
+    """``(size, mtime_ns)`` of ``filename``, or None if it does not exist."""
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def diff_ops(current, tasks):
+    """Journal records that turn the tasks in ``current`` into ``tasks``.
+
+    Only tasks that differ produce a record, so applying the result touches
+    just what actually changed.
+    """
+    by_id = {task['id']: task for task in current}
+    ops = []
+    for task in tasks:
+        old = by_id.pop(task['id'], None)
+        if old is None:
+            ops.append({'op': 'add', 'task': dict(task)})
+        else:
+            fields = {key: value for key, value in task.items() if old.get(key) != value}
+            if fields:
+                ops.append({'op': 'set', 'id': task['id'], 'fields': fields})
+    ops.extend({'op': 'remove', 'id': task_id} for task_id in by_id)
+    return ops
+
+
+class JsonFileStorage:
+    """The original storage: the whole task list rewritten to one JSON file.
+
+    Write failures go to ``on_error(message)`` when it is set and are printed
+    otherwise.  It may be called from a background thread.  With ``cache``
+    on, loads go through a binary snapshot cache (see ``snapshot_cache``) that
+    is rebuilt whenever the JSON file has changed.
+
+    Several app instances may share the file.  Writes hold an advisory
+    ``FileLock`` and are optimistic: if the lock's write counter (or the
+    file's size and mtime) moved since this instance last read or wrote, the
+    other instance's file is taken as the base and only this instance's
+    changes are applied on top.  ``poll_changes`` reports what other
+    instances changed as journal records.
+    """
+
+    def __init__(self, filename='tasks.json', cache=True):
+        self.filename = filename
+        self.meta_filename = filename + '.meta'
+        self.cache = cache
+        self.on_error = None
+        self.file_lock = FileLock(filename)
+        self._signature = None
+        self._version = None
+
+    def report_error(self, message):
+        if self.on_error is not None:
+            self.on_error(message)
+        else:
+            print(message)
+
+    def lock(self):
+        return self.file_lock
+
+    def open_store(self):
+        return TaskStore(self.load())
+
+    def load(self):
+        with self.lock():
+            self._version = self.file_lock.version()
+            self._signature = file_signature(self.filename)
+            return self._read_tasks()
+
+    def _changed_on_disk(self):
+        # Call with the lock held.
+        return self.file_lock.version() != self._version or \
+            file_signature(self.filename) != self._signature
+
+    def _read_tasks(self):
+        if not os.path.exists(self.filename):
+            return []
+        if self.cache:
+            tasks = read_cache(self.filename)
+            if tasks is not None:
+                return tasks
+        try:
+            with open(self.filename, 'r') as f:
+                tasks = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error loading tasks: {e}")
+            return []
+        if self.cache:
+            write_cache(self.filename, tasks)
+        return tasks
+
+    def save(self, tasks):
+        with self.lock():
+            self._write_tasks(tasks, caught_up=True)
+
+    def _write_tasks(self, tasks, caught_up):
+        try:
+            write_atomic(self.filename, json.dumps(list(tasks), indent=4, default=dict))
+        except IOError as e:
+            self.report_error(f"Error saving tasks: {e}")
+            return
+        version = self.file_lock.bump_version()
+        if caught_up:
+            self._version = version
+            self._signature = file_signature(self.filename)
+
+    def load_meta(self):
+        if not os.path.exists(self.meta_filename):
+            return {}
+        try:
+            with open(self.meta_filename, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error loading task metadata: {e}")
+            return {}
+
+    def save_meta(self, meta):
+        try:
+            with self.lock():
+                write_atomic(self.meta_filename, json.dumps(meta))
+        except IOError as e:
+            self.report_error(f"Error saving task metadata: {e}")
+
+    def record(self, ops, get_tasks):
+        with self.lock():
+            if not self._changed_on_disk():
+                self._write_tasks(get_tasks(), caught_up=True)
+                return
+            # Someone else saved since we last looked: keep their file and
+            # replay our records over it.  We stay out of date, and keep
+            # merging like this, until poll_changes brings their part in.
+            theirs = {task['id']: dict(task) for task in self._read_tasks()}
+            for op in ops:
+                apply_op(theirs, _detached(op))
+            self._write_tasks(theirs.values(), caught_up=False)
+
+    def poll_changes(self, store):
+        """Records describing changes other instances saved since the last call.
+
+        Checking costs a lock, a tiny read and one ``stat`` when nothing
+        changed.
+        """
+        with self.lock():
+            if not self._changed_on_disk():
+                return []
+            return diff_ops(store, self.load())
+
+    def abort(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.file_lock.close()
+
+
+class JournalStorage(JsonFileStorage):
+    """JSON snapshot plus an append-only journal of mutations.
+
+    Every mutation appends one line to ``<filename>.journal``.  Loading reads
+    the snapshot and replays the journal over it.  Once the journal grows past
+    ``compact_threshold`` bytes, or half the snapshot's size if that is larger,
+    it is rotated to ``<filename>.journal.1`` and a background thread writes a
+    fresh snapshot, after which the rotated segment is deleted.  Scaling with
+    the snapshot keeps the cost of rewriting it in proportion to the records
+    written, however many tasks there are.
+
+    The journal is also how instances sharing the file see each other's
+    changes: this instance remembers how far into the journal it has read,
+    and ``poll_changes`` returns just the records appended since.  Only when
+    another instance compacts does it fall back to reloading the snapshot.
+    """
+
+    def __init__(self, filename='tasks.json', compact_threshold=1024 * 1024, fsync=False, cache=True):
+        super().__init__(filename, cache)
+        self.journal_filename = filename + '.journal'
+        self.rotated_filename = filename + '.journal.1'
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self._journal = None
+        self._journal_offset = 0
+        self._journal_inode = None
+        self._compactor = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self.lock():
+            tasks = super().load()
+            tasks_by_id = {task['id']: task for task in tasks}
+            if os.path.exists(self.rotated_filename):
+                self._replay(self.rotated_filename, tasks_by_id)
+            self._journal_offset = 0
+            self._journal_inode = None
+            if os.path.exists(self.journal_filename):
+                self._journal_offset = self._replay(self.journal_filename, tasks_by_id)
+                self._journal_inode = os.stat(self.journal_filename).st_ino
+            return list(tasks_by_id.values())
+
+    def _replay(self, filename, tasks_by_id):
+        good_size = 0
+        with open(filename, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    # Torn write from a crash: drop the partial record.
+                    break
+                try:
+                    op = json.loads(raw)
+                except ValueError as e:
+                    print(f"Error replaying journal {filename}: {e}")
+                else:
+                    apply_op(tasks_by_id, op)
+                good_size += len(raw)
+        if good_size != os.path.getsize(filename):
+            with open(filename, 'r+b') as f:
+                f.truncate(good_size)
+        return good_size
+
+    def _open_journal(self):
+        # Another instance may have rotated the journal away from under us.
+        if self._journal is not None and os.path.exists(self.journal_filename) and \
+                os.stat(self.journal_filename).st_ino == os.fstat(self._journal.fileno()).st_ino:
+            return self._journal
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_filename, 'a')
+        return self._journal
+
+    def record(self, ops, get_tasks):
+        data = ''.join(json.dumps(op, separators=(',', ':'), default=dict) + '\n' for op in ops)
+        try:
+            with self.lock():
+                caught_up = not self._changed_on_disk()
+                journal = self._open_journal()
+                journal.write(data)
+                journal.flush()
+                if self.fsync:
+                    os.fsync(journal.fileno())
+                version = self.file_lock.bump_version()
+                if caught_up:
+                    # Nobody else wrote since we last read, so the journal
+                    # up to here is already in our store.
+                    self._version = version
+                    self._journal_offset = journal.tell()
+                    self._journal_inode = os.fstat(journal.fileno()).st_ino
+                    snapshot_size = self._signature[0] if self._signature else 0
+                    if self._journal_offset >= max(self.compact_threshold, snapshot_size // 2):
+                        self.compact(get_tasks, background=True)
+        except IOError as e:
+            self.report_error(f"Error writing journal: {e}")
+            return
+        STATS.add_bytes('storage.journal', len(data))
+
+    def poll_changes(self, store):
+        """Journal records other instances appended since we last read.
+
+        Costs a lock and a tiny read when nothing changed.  Our own records
+        may come back too if they were interleaved with someone else's;
+        replaying them is harmless.
+        """
+        with self.lock():
+            version = self.file_lock.version()
+            if version == self._version:
+                return []
+            unread = self._unread_records()
+            if unread is None:
+                return diff_ops(store, self.load())
+            ops, self._journal_offset, self._journal_inode = unread
+            self._version = version
+            return ops
+
+    def _unread_records(self):
+        """``(ops, offset, inode)`` for the journal records after our offset.
+
+        None when the snapshot or the journal was replaced since we read
+        them, so only a full reload can tell what changed.  Call with the
+        lock held.
+        """
+        if file_signature(self.filename) != self._signature:
+            return None
+        try:
+            stat = os.stat(self.journal_filename)
+        except FileNotFoundError:
+            if self._journal_inode is not None:
+                return None
+            return [], 0, None
+        if self._journal_inode not in (None, stat.st_ino) or stat.st_size < self._journal_offset:
+            return None
+        ops = []
+        offset = self._journal_offset
+        with open(self.journal_filename, 'rb') as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                offset += len(raw)
+                try:
+                    ops.append(json.loads(raw))
+                except ValueError as e:
+                    print(f"Error replaying journal {self.journal_filename}: {e}")
+        return ops, offset, stat.st_ino
+
+    def compact(self, get_tasks, background=False):
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+        with self.lock():
+            if background and os.path.exists(self.rotated_filename):
+                # Another instance is still writing its snapshot; folding our
+                # journal into its segment would lose records when it finishes.
+                return
+            # Otherwise a leftover segment from an interrupted compaction is
+            # folded into this one.
+            caught_up = not self._changed_on_disk()
+            if not caught_up and background:
+                return
+            tasks = [dict(task) for task in get_tasks()]
+            merged = False
+            unread = None if caught_up or self._version is None else self._unread_records()
+            if unread and unread[0]:
+                # Records other instances appended since our last poll would
+                # vanish with the journal; replay them over ours first.  (A
+                # replaced journal or snapshot leaves nothing to replay, and
+                # ``tasks`` is written as given, as a save always did.)
+                tasks_by_id = {task['id']: task for task in tasks}
+                for op in unread[0]:
+                    apply_op(tasks_by_id, _detached(op))
+                tasks = list(tasks_by_id.values())
+                merged = True
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if os.path.exists(self.journal_filename):
+                if os.path.exists(self.rotated_filename):
+                    with open(self.rotated_filename, 'a') as rotated, open(self.journal_filename) as journal:
+                        rotated.write(journal.read())
+                    os.remove(self.journal_filename)
+                else:
+                    os.replace(self.journal_filename, self.rotated_filename)
+            self._journal_offset = 0
+            self._journal_inode = None
+            version = self.file_lock.bump_version()
+            if caught_up:
+                self._version = version
+        if background:
+            self._compactor = threading.Thread(target=self._write_snapshot, args=(tasks,), daemon=True)
+            self._compactor.start()
+        else:
+            self._write_snapshot(tasks)
+            if merged:
+                # Our caller has not seen the replayed records; make the next
+                # poll_changes reload to bring them in.
+                self._version = None
+                self._signature = None
+
+    def _write_snapshot(self, tasks):
+        tmp_name = f"{self.filename}.{os.getpid()}.snapshot.tmp"
+        try:
+            data = json.dumps(tasks, indent=4)
+            with open(tmp_name, 'w') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            with self.lock():
+                caught_up = not self._changed_on_disk()
+                os.replace(tmp_name, self.filename)
+                self._signature = file_signature(self.filename)
+                version = self.file_lock.bump_version()
+                if caught_up:
+                    self._version = version
+                if os.path.exists(self.rotated_filename):
+                    os.remove(self.rotated_filename)
+                if self.cache:
+                    write_cache(self.filename, tasks)
+            STATS.add_bytes('storage.snapshot', len(data))
+        except IOError as e:
+            self.report_error(f"Error compacting journal: {e}")
+
+    def _wait(self):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def save(self, tasks):
+        self._wait()
+        self.compact(lambda: tasks)
+
+    def flush(self):
+        self._wait()
+
+    def close(self):
+        self._wait()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        self.file_lock.close()
+
+
+class BackgroundStorage:
+    """Moves the writes of a JSON or journal storage onto one writer thread.
+
+    ``record``, ``save`` and ``save_meta`` only queue the change and return.
+    The writer waits ``delay`` seconds after the first queued change, then
+    persists everything that arrived in that window with a single write: one
+    atomic snapshot for ``JsonFileStorage`` or one journal append for
+    ``JournalStorage``.  The writer keeps its own plain-dict copy of the tasks,
+    so it never reads the store the UI thread is changing.  ``flush()`` blocks
+    until everything queued so far is on disk.  Metadata is written straight
+    away because id reservations must reach the disk while the lock is held.
+    """
+
+    def __init__(self, storage, delay=0.5):
+        self.storage = storage
+        self.delay = delay
+        self._queue = []
+        self._tasks = {}
+        self._writing = False
+        self._flushing = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._writer = None
+
+    @property
+    def on_error(self):
+        return self.storage.on_error
+
+    @on_error.setter
+    def on_error(self, callback):
+        self.storage.on_error = callback
+
+    def report_error(self, message):
+        self.storage.report_error(message)
+
+    def open_store(self):
+        store = self.storage.open_store()
+        self._tasks = {task['id']: dict(task) for task in store}
+        return store
+
+    def load(self):
+        return self.storage.load()
+
+    def load_meta(self):
+        return self.storage.load_meta()
+
+    def lock(self):
+        return self.storage.lock()
+
+    def poll_changes(self, store):
+        self.flush()
+        ops = self.storage.poll_changes(store)
+        # The writer is idle after flush(), so its copy can be updated here.
+        for op in ops:
+            apply_op(self._tasks, _detached(op))
+        return ops
+
+    def _enqueue(self, kind, value):
+        with self._cond:
+            self._queue.append((kind, value))
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, daemon=True)
+                self._writer.start()
+            self._cond.notify_all()
+
+    def record(self, ops, get_tasks):
+        self._enqueue('ops', [_detached(op) for op in ops])
+
+    def save(self, tasks):
+        self._enqueue('save', [dict(task) for task in tasks])
+
+    def save_meta(self, meta):
+        self.storage.save_meta(meta)
+
+    def abort(self):
+        self.storage.abort()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                deadline = time.monotonic() + self.delay
+                while not self._flushing and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                queued = self._queue
+                self._queue = []
+                self._writing = True
+            try:
+                self._write(queued)
+            except Exception as e:
+                self.storage.report_error(f"Error saving tasks: {e}")
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _write(self, queued):
+        ops = []
+        snapshot = False
+        for kind, value in queued:
+            if kind == 'ops':
+                for op in value:
+                    apply_op(self._tasks, op)
+                ops.extend(value)
+            else:
+                self._tasks = {task['id']: task for task in value}
+                snapshot = True
+        if snapshot:
+            # The snapshot already includes any ops queued after the save.
+            self.storage.save(list(self._tasks.values()))
+        elif ops:
+            self.storage.record(ops, lambda: list(self._tasks.values()))
+
+    def flush(self):
+        with self._cond:
+            self._flushing = True
+            self._cond.notify_all()
+            while self._queue or self._writing:
+                self._cond.wait()
+            self._flushing = False
+        self.storage.flush()
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+        self.storage.close()
+
+
+def _detached(op):
+    """Copy a journal record so later edits to the live task cannot leak into it."""
+    if op.get('op') == 'add':
+        return dict(op, task=dict(op['task']))
+    if op.get('op') == 'set':
+        return dict(op, fields=dict(op['fields']))
+    return op
@@ -0,0 +1,124 @@
+import json
+import os
+
+from file_lock import FileLock
+from instrumentation import STATS
+from storage import apply_op, file_signature, write_atomic
+from task_store import TaskStore
+
+# Dead records tolerated in the segment before it is rewritten.
+COMPACT_SLACK = 10000
+
+
+class TaskArchive:
+    """Completed tasks moved out of the live task list into a cold segment.
+
+    The segment is a file of journal records in the ``JournalStorage``
+    format: archiving appends an 'add' record per task, restoring or
+    deleting appends a 'remove'.  Appending never reads the segment, so
+    archiving costs nothing until someone looks.  ``load()`` replays it into
+    a ``TaskStore``, which then answers ``get`` and ``query`` like the live
+    store.  Writes hold a ``FileLock`` on the segment; a segment another
+    instance changed is read again on the next ``load()``.  Records that
+    cannot be read go to ``on_error(message)`` when it is set and are printed
+    otherwise, as with the storages.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.on_error = None
+        self.file_lock = FileLock(filename)
+        self.store = None
+        self.records = 0
+        self._signature = None
+
+    def report_error(self, message):
+        if self.on_error is not None:
+            self.on_error(message)
+        else:
+            print(message)
+
+    @property
+    def loaded(self):
+        return self.store is not None
+
+    def load(self):
+        with self.file_lock:
+            if self.store is None or file_signature(self.filename) != self._signature:
+                self.store = TaskStore(self._replay())
+                self._signature = file_signature(self.filename)
+        return self.store
+
+    def _replay(self):
+        tasks_by_id = {}
+        self.records = 0
+        if not os.path.exists(self.filename):
+            return []
+        with open(self.filename, 'rb') as f:
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                try:
+                    apply_op(tasks_by_id, json.loads(raw))
+                except ValueError as e:
+                    self.report_error(f"Error reading archive {self.filename}: {e}")
+                self.records += 1
+        return tasks_by_id.values()
+
+    def __len__(self):
+        return len(self.store) if self.store is not None else 0
+
+    def get(self, task_id):
+        return self.store.get(task_id) if self.store is not None else None
+
+    def add(self, tasks):
+        """Append ``tasks`` to the segment (and the loaded store, if any)."""
+        self._append([{'op': 'add', 'task': dict(task)} for task in tasks])
+        if self.store is not None:
+            for task in tasks:
+                self.store.insert(task)
+
+    def take(self, task_ids):
+        """Remove ``task_ids`` from the archive and return the tasks that were there."""
+        store = self.load()
+        taken = [store.get(task_id) for task_id in task_ids if task_id in store]
+        if not taken:
+            return []
+        self._append([{'op': 'remove', 'id': task['id']} for task in taken])
+        for task in taken:
+            store.delete(task['id'])
+        if self.records > 2 * len(store) + COMPACT_SLACK:
+            self.compact()
+        return taken
+
+    def _append(self, ops):
+        data = ''.join(json.dumps(op, separators=(',', ':'), default=dict) + '\n' for op in ops).encode()
+        with self.file_lock:
+            current = file_signature(self.filename) == self._signature
+            with open(self.filename, 'a+b') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        # A crash cut the last record short; end it so replay skips it.
+                        data = b'\n' + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self.records += len(ops)
+            if current:
+                self._signature = file_signature(self.filename)
+        STATS.add_bytes('archive', len(data))
+
+    def compact(self):
+        """Rewrite the segment with one 'add' record per archived task."""
+        with self.file_lock:
+            store = self.load()
+            write_atomic(self.filename, ''.join(
+                json.dumps({'op': 'add', 'task': dict(task)}, separators=(',', ':')) + '\n'
+                for task in store))
+            self.records = len(store)
+            self._signature = file_signature(self.filename)
+
+    def close(self):
+        self.file_lock.close()
@@ -0,0 +1,108 @@
+import csv
+import gzip
+import io
+import json
+import os
+
+from instrumentation import STATS
+
+CSV_HEADER = ["ID", "Name", "Priority", "Due Date", "Status"]
+FORMATS = ('csv', 'jsonl')
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson', '.json')
+# Save dialog file types: (label, extension).
+FILE_TYPES = [("CSV files", ".csv"), ("CSV files (gzip)", ".csv.gz"),
+              ("JSON Lines", ".jsonl"), ("JSON Lines (gzip)", ".jsonl.gz")]
+
+
+def detect_format(file_path):
+    """Guess ``(format, compress)`` from a file name such as ``tasks.jsonl.gz``."""
+    name = file_path.lower()
+    compress = name.endswith('.gz')
+    if compress:
+        name = name[:-3]
+    fmt = 'jsonl' if name.endswith(JSONL_EXTENSIONS) else 'csv'
+    return fmt, compress
+
+
+def with_extension(file_path, file_type):
+    """``file_path`` ending in the extension of the ``FILE_TYPES`` label ``file_type``.
+
+    A name that already ends in an export extension is left as typed; other
+    names get the chosen type's extension (CSV for unknown labels), so the
+    format written is always the one the name says.
+    """
+    name = file_path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    if name.endswith(('.csv',) + JSONL_EXTENSIONS):
+        return file_path
+    return file_path + dict(FILE_TYPES).get(file_type, '.csv')
+
+
+def csv_rows(tasks):
+    for task in tasks:
+        yield [task['id'], task['name'], task['priority'], task['due_date'], task['status']]
+
+
+def jsonl_lines(tasks):
+    for task in tasks:
+        yield json.dumps(dict(task)) + "\n"
+
+
+def _open_text(file_path, compress, buffer_size):
+    if compress:
+        raw = io.BufferedWriter(gzip.GzipFile(file_path, 'wb'), buffer_size)
+        return io.TextIOWrapper(raw, newline='')
+    return open(file_path, 'w', newline='', buffering=buffer_size)
+
+
+def write_export(tasks, file_path, fmt=None, compress=None, progress=None, cancelled=None,
+                 buffer_size=1024 * 1024, progress_every=5000):
+    """Stream ``tasks`` to ``file_path`` as CSV or JSON Lines, optionally gzipped.
+
+    Rows are written one at a time through a buffered writer, so memory stays
+    flat however many tasks there are.  Output goes to ``<file_path>.part`` and
+    is renamed into place at the end.  Returns ``file_path``, or None if
+    ``cancelled()`` became True.  I/O errors propagate to the caller.
+    """
+    detected_fmt, detected_compress = detect_format(file_path)
+    fmt = fmt or detected_fmt
+    compress = detected_compress if compress is None else compress
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    total = len(tasks) if hasattr(tasks, '__len__') else None
+
+    part_path = file_path + '.part'
+    done = 0
+    stopped = False
+    try:
+        with _open_text(part_path, compress, buffer_size) as f:
+            if fmt == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(CSV_HEADER)
+                records = csv_rows(tasks)
+                write = writer.writerow
+            else:
+                records = jsonl_lines(tasks)
+                write = f.write
+            for record in records:
+                write(record)
+                done += 1
+                if done % progress_every == 0:
+                    if progress is not None:
+                        progress(done, total)
+                    if cancelled is not None and cancelled():
+                        stopped = True
+                        break
+        if stopped:
+            os.remove(part_path)
+            return None
+        os.replace(part_path, file_path)
+        STATS.add_bytes('export', os.path.getsize(file_path))
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    if progress is not None:
+        progress(done, done)
+    return file_path
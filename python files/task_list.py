@@ -0,0 +1,311 @@
+import tkinter as tk
+from bisect import bisect_left
+from tkinter import ttk
+
+from instrumentation import timed
+from task_query import SORT_KEYS
+
+COLUMNS = ("Task Name", "Priority", "Due date", "Status")
+COLUMN_FIELDS = {"#0": 'id', "Task Name": 'name', "Priority": 'priority',
+                 "Due date": 'due_date', "Status": 'status'}
+BUFFER_ROWS = 2
+SHIFT_OR_CONTROL = 0x0001 | 0x0004
+
+
+def row_values(task):
+    return (task['name'], task['priority'], task['due_date'], task['status'])
+
+
+def increasing_run(values):
+    """Flags marking one longest strictly increasing subsequence of ``values``, in O(n log n)."""
+    tails = []
+    tail_values = []
+    previous = [-1] * len(values)
+    for index, value in enumerate(values):
+        length = bisect_left(tail_values, value)
+        if length:
+            previous[index] = tails[length - 1]
+        if length == len(tails):
+            tails.append(index)
+            tail_values.append(value)
+        else:
+            tails[length] = index
+            tail_values[length] = value
+    keep = [False] * len(values)
+    index = tails[-1] if tails else -1
+    while index >= 0:
+        keep[index] = True
+        index = previous[index]
+    return keep
+
+
+class TaskList(ttk.Frame):
+    """One notebook tab's task table.
+
+    The rows shown are kept model-side in ``ids``, an ordered list of task
+    ids.  In full mode every row is a Treeview item, found through the
+    ``items`` map from task id to item.  In virtual mode only the rows that fit the viewport (plus
+    ``BUFFER_ROWS``) exist as items; scrolling moves a window over ``ids`` and
+    rewrites those items in place, and the selection is remembered by task
+    id so it survives scrolling.
+    """
+
+    def __init__(self, parent, task_manager, on_heading, virtual=False):
+        super().__init__(parent)
+        self.task_manager = task_manager
+        self.virtual = virtual
+        self.ids = []
+        self.members = set()
+        self.items = {}
+        self.offset = 0
+        self.slots = []
+        self.slot_ids = {}
+        self.selected = {}
+        self.click_mode = None
+        self.sort_field = None
+        self.sort_reverse = False
+
+        self.treeview = ttk.Treeview(self, columns=COLUMNS)
+        self.treeview.column("#0", width=50, stretch=False)
+        self.treeview.heading("#0", text="ID", anchor=tk.W, command=lambda: on_heading(self, "#0"))
+        for col in COLUMNS:
+            self.treeview.heading(col, text=col, anchor=tk.W, command=lambda col=col: on_heading(self, col))
+        self.treeview.column("Task Name", width=150, stretch=True)
+        self.treeview.column("Priority", width=100, stretch=False)
+        self.treeview.column("Due date", width=100, stretch=False)
+        self.treeview.column("Status", width=100, stretch=True)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL)
+        if virtual:
+            self.scrollbar.config(command=self.yview)
+            self.treeview.bind("<Configure>", lambda event: self.render())
+            self.treeview.bind("<MouseWheel>", self.on_mousewheel)
+            self.treeview.bind("<Button-4>", lambda event: self.scroll_by(-3))
+            self.treeview.bind("<Button-5>", lambda event: self.scroll_by(3))
+            self.treeview.bind("<Up>", lambda event: self.on_arrow(-1))
+            self.treeview.bind("<Down>", lambda event: self.on_arrow(1))
+            self.treeview.bind("<Prior>", lambda event: self.scroll_by(-self.visible_rows()))
+            self.treeview.bind("<Next>", lambda event: self.scroll_by(self.visible_rows()))
+            self.treeview.bind("<Button-1>", self.on_click)
+            self.treeview.bind("<<TreeviewSelect>>", self.on_select)
+        else:
+            self.scrollbar.config(command=self.treeview.yview)
+            self.treeview.config(yscrollcommand=self.scrollbar.set)
+
+        self.scrollbar.pack(side="right", fill="y")
+        self.treeview.pack(side="left", fill="both", expand=True)
+        self.pack(fill="both", expand=True)
+
+    def __contains__(self, task_id):
+        return task_id in self.members
+
+    def set_rows(self, ids):
+        """Show exactly ``ids``, in order unless a column sort is active."""
+        self.ids = list(ids)
+        self.members = set(self.ids)
+        if self.sort_field is not None:
+            self.ids = self.sorted_members()
+        if self.virtual:
+            self.selected = {task_id: True for task_id in self.selected if task_id in self.members}
+            self.offset = min(self.offset, self.max_offset())
+            self.render()
+            return
+        self.treeview.delete(*self.treeview.get_children())
+        self.items = {}
+        self.insert_items(self.ids)
+
+    def insert_items(self, ids):
+        get_task = self.task_manager.get_task_by_id
+        for task_id in ids:
+            task = get_task(task_id)
+            self.items[task_id] = self.treeview.insert("", "end", iid=str(task_id), text=task_id,
+                                                       values=row_values(task))
+
+    def add_rows(self, ids):
+        ids = [task_id for task_id in ids if task_id not in self.members]
+        if not ids:
+            return
+        self.ids.extend(ids)
+        self.members.update(ids)
+        if self.sort_field is not None:
+            if not self.virtual:
+                self.insert_items(ids)
+            self.reorder(self.sorted_members())
+        elif self.virtual:
+            if self.offset + len(self.slots) >= len(self.ids) - len(ids):
+                self.render()
+            else:
+                self.update_scrollbar()
+        else:
+            self.insert_items(ids)
+
+    def remove_rows(self, ids):
+        gone = self.members.intersection(ids)
+        if not gone:
+            return
+        self.ids = [task_id for task_id in self.ids if task_id not in gone]
+        self.members -= gone
+        if self.virtual:
+            for task_id in gone:
+                self.selected.pop(task_id, None)
+            self.offset = min(self.offset, self.max_offset())
+            self.render()
+        else:
+            self.treeview.delete(*[self.items.pop(task_id) for task_id in gone])
+
+    def refresh_rows(self, ids):
+        """Redraw the rows of ``ids`` after their fields changed."""
+        get_task = self.task_manager.get_task_by_id
+        if self.sort_field is not None and not self.members.isdisjoint(ids):
+            self.reorder(self.sorted_members())
+            if self.virtual:
+                return
+        if self.virtual:
+            if not set(self.slot_ids.values()).isdisjoint(ids):
+                self.render()
+            return
+        for task_id in ids:
+            iid = self.items.get(task_id)
+            if iid is not None:
+                self.treeview.item(iid, values=row_values(get_task(task_id)))
+
+    def selected_ids(self):
+        if self.virtual:
+            return list(self.selected)
+        return [int(iid) for iid in self.treeview.selection()]
+
+    @timed('task_list.sort_by')
+    def sort_by(self, col, reverse):
+        self.sort_field = COLUMN_FIELDS[col]
+        self.sort_reverse = reverse
+        self.reorder(self.sorted_members())
+
+    def sorted_members(self):
+        order = self.task_manager.sorted_ids(self.sort_field, self.sort_reverse)
+        members = self.members
+        ids = [task_id for task_id in order if task_id in members]
+        if len(ids) < len(members):
+            # Archived rows are not in the task list's sort order; sort the rows themselves.
+            get_task = self.task_manager.get_task_by_id
+            field = self.sort_field
+            key = SORT_KEYS[field]
+            ids = sorted(members, key=lambda task_id: (key(get_task(task_id)[field]), task_id),
+                         reverse=self.sort_reverse)
+        return ids
+
+    def reorder(self, order):
+        """Put the rows in ``order``, moving only the Treeview items that are out of place.
+
+        The rows on a longest run already in the right relative order stay
+        where they are.  The others are detached, which leaves that run in
+        place, and re-attached at their new index one by one.
+        """
+        current = self.ids
+        self.ids = order
+        if self.virtual:
+            self.render()
+            return
+        position = {task_id: index for index, task_id in enumerate(current)}
+        keep = increasing_run([position[task_id] for task_id in order])
+        items = self.items
+        moving = [index for index, kept in enumerate(keep) if not kept]
+        if not moving:
+            return
+        self.treeview.detach(*[items[order[index]] for index in moving])
+        for index in moving:
+            self.treeview.move(items[order[index]], '', index)
+
+    # Virtual mode
+
+    def visible_rows(self):
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or 20
+        heading_height = 25
+        height = self.treeview.winfo_height() - heading_height
+        return max(1, height // int(row_height))
+
+    def max_offset(self):
+        return max(0, len(self.ids) - self.visible_rows())
+
+    @timed('task_list.render')
+    def render(self):
+        count = min(len(self.ids) - self.offset, self.visible_rows() + BUFFER_ROWS)
+        count = max(count, 0)
+        while len(self.slots) < count:
+            self.slots.append(self.treeview.insert("", "end"))
+        while len(self.slots) > count:
+            self.treeview.delete(self.slots.pop())
+
+        get_task = self.task_manager.get_task_by_id
+        self.slot_ids = {}
+        selection = []
+        for iid, task_id in zip(self.slots, self.ids[self.offset:self.offset + count]):
+            task = get_task(task_id)
+            self.treeview.item(iid, text=task_id, values=row_values(task))
+            self.slot_ids[iid] = task_id
+            if task_id in self.selected:
+                selection.append(iid)
+        self.treeview.selection_set(selection)
+        self.treeview.yview_moveto(0)
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        total = len(self.ids)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows()) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(int(offset), self.max_offset()))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+        return "break"
+
+    def scroll_by(self, rows):
+        return self.scroll_to(self.offset + rows)
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.ids))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible_rows()
+            self.scroll_by(amount)
+
+    def on_mousewheel(self, event):
+        notches = event.delta / 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll_by(-int(notches) * 3)
+
+    def on_arrow(self, step):
+        focus = self.treeview.focus()
+        if focus not in self.slot_ids:
+            return None
+        position = self.ids.index(self.slot_ids[focus], self.offset) - self.offset + step
+        if 0 <= position < self.visible_rows() and position < len(self.slots):
+            return None
+        self.scroll_by(step)
+        position = max(0, min(position, len(self.slots) - 1, self.visible_rows() - 1))
+        if self.slots:
+            iid = self.slots[position]
+            self.selected = {self.slot_ids[iid]: True}
+            self.click_mode = "replace"
+            self.treeview.selection_set(iid)
+            self.treeview.focus(iid)
+        return "break"
+
+    def on_click(self, event):
+        self.click_mode = "extend" if event.state & SHIFT_OR_CONTROL else "replace"
+
+    def on_select(self, event):
+        visible = {self.slot_ids[iid] for iid in self.treeview.selection() if iid in self.slot_ids}
+        if self.click_mode == "replace":
+            self.selected = dict.fromkeys(visible, True)
+        else:
+            for task_id in self.slot_ids.values():
+                if task_id in visible:
+                    self.selected[task_id] = True
+                else:
+                    self.selected.pop(task_id, None)
+        self.click_mode = None
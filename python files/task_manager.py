@@ -1,39 +1,276 @@
-import json
-import os
-import random
+import heapq
+from contextlib import contextmanager
 from datetime import datetime
-import csv
+from operator import itemgetter
+
+from csv_import import ImportReport, read_csv_tasks
+from id_allocator import allocator_from_state
+from instrumentation import STATS, timed
+from search_cache import SearchCache
+from storage import JsonFileStorage
+from task_archive import TaskArchive
+from task_export import write_export
+from task_query import as_list, filter_matcher, matches_terms, parse_query, search_terms, to_day
+from undo_history import UndoHistory, record_size
+
+# Net effect of two changes to the same task inside one batch; None means
+# the task ends up as it started (added, then removed again).
+MERGED_CHANGES = {
+    ('added', 'updated'): 'added',
+    ('added', 'removed'): None,
+    ('updated', 'updated'): 'updated',
+    ('updated', 'removed'): 'removed',
+    ('removed', 'added'): 'updated',
+}
+CHANGE_KINDS = ('removed', 'added', 'updated')
+# Cached results up to this size are narrowed in place rather than searched again.
+NARROW_LIMIT = 5000
+ARCHIVED_STATUS = 'COMPLETED'
 
 
 class TaskManager:
-    def __init__(self, filename='tasks.json'):
+    def __init__(self, filename='tasks.json', storage=None, allocator=None, archive=None, history=None):
         self.filename = filename
-        self.tasks = self.load_tasks()
+        self.storage = storage if storage is not None else JsonFileStorage(filename)
+        self.archive = archive if archive is not None else TaskArchive(filename + '.archive')
+        # Archive problems reach the user the same way as storage ones.
+        self.archive.on_error = self.storage.report_error
+        with STATS.timer('task_manager.load'):
+            self.store = self.storage.open_store()
+        self.meta = self.storage.load_meta()
+        if allocator is None:
+            allocator = allocator_from_state(self.meta.get('allocator'))
+        self.allocator = allocator
+        for task_id in self.store.ids():
+            self.allocator.observe(task_id)
+        self._pending_ops = None
+        self._rollback_log = None
+        self._listeners = []
+        self._changes = None
+        self._commit_actions = None
+        self.history = history if history is not None else UndoHistory()
+        self._undo_log = None
+        self._undo_size = 0
+        # Set while undo() or redo() runs, to say which stack the reverse goes to.
+        self._replaying = None
+        # Bumped on every change so cached search results know they are stale.
+        self.data_version = 0
+        self._search_cache = SearchCache()
+
+    @property
+    def tasks(self):
+        """The stored tasks, read-only: a tuple of live ``Task`` objects.
 
+        Tasks are no longer a list of dicts that callers may edit in place;
+        assign a whole new list to ``tasks``, or use the add/update/remove
+        methods.  ``get_tasks()`` returns plain dict copies.
+        """
+        return tuple(self.store)
+
+    @tasks.setter
+    def tasks(self, tasks):
+        self.store.reset(tasks)
+        for task_id in self.store.ids():
+            self.allocator.observe(task_id)
+        self._notify('reset', [])
+
+    @timed('task_manager.load_tasks')
     def load_tasks(self):
-        if not os.path.exists(self.filename):
-            return []
-        try:
-            with open(self.filename, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"Error loading tasks: {e}")
-            return []
+        return self.storage.load()
 
+    @timed('task_manager.save_tasks')
     def save_tasks(self):
+        self.storage.save(self.store)
+
+    def _record(self, *ops):
+        if self._pending_ops is not None:
+            self._pending_ops.extend(ops)
+        elif ops:
+            self.storage.record(ops, lambda: self.store)
+
+    def subscribe(self, listener):
+        """Call ``listener(kind, ids)`` after tasks change.
+
+        ``kind`` is 'added', 'updated' or 'removed'; changes made inside a
+        ``batch()`` arrive once the batch succeeds, merged per task.  A
+        'reset' (with no ids) means the whole task list was replaced.
+        'archived' and 'restored' name tasks that moved into or out of the
+        archive; they come with the matching 'removed' or 'added'.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _changed(self, kind, task_id):
+        self.data_version += 1
+        if self._changes is None:
+            self._notify(kind, [task_id])
+            return
+        previous = self._changes.get(task_id)
+        if previous is not None:
+            kind = MERGED_CHANGES.get((previous, kind), kind)
+        if kind is None:
+            del self._changes[task_id]
+        else:
+            self._changes[task_id] = kind
+
+    def _notify(self, kind, ids):
+        self.data_version += 1
+        for listener in list(self._listeners):
+            listener(kind, ids)
+
+    def _on_rollback(self, undo):
+        if self._rollback_log is not None:
+            self._rollback_log.append(undo)
+
+    def _log_inverse(self, op):
+        # ``op`` undoes the change just made; a batch collects them into one step.
+        if self._undo_log is None:
+            self._remember([op])
+            return
+        self._undo_size += record_size(op)
+        if self._undo_size <= self.history.limit:
+            self._undo_log.append(op)
+        elif self._undo_log:
+            # Too big to keep; the step is given up once the batch ends.
+            self._undo_log = []
+
+    def _remember(self, ops):
+        if self._replaying == 'undo':
+            self.history.push_redo(ops)
+        elif self._replaying == 'redo':
+            self.history.push_undo(ops)
+        else:
+            self.history.record(ops)
+
+    def _on_commit(self, action):
+        # Runs once the batch's records are handed to storage; dropped on rollback.
+        if self._commit_actions is not None:
+            self._commit_actions.append(action)
+        else:
+            action()
+
+    @contextmanager
+    def batch(self):
+        """Group mutations so they are persisted once, or not at all on error.
+
+        Nested ``batch()`` blocks join the outermost one.
+        """
+        if self._pending_ops is not None:
+            yield self
+            return
+        self._pending_ops = []
+        self._rollback_log = []
+        self._changes = {}
+        self._commit_actions = []
+        self._undo_log = []
+        self._undo_size = 0
         try:
-            with open(self.filename, 'w') as f:
-                json.dump(self.tasks, f, indent=4)
-        except IOError as e:
-            print(f"Error saving tasks: {e}")
+            yield self
+        except BaseException:
+            for undo in reversed(self._rollback_log):
+                undo()
+            self.data_version += 1
+            self.storage.abort()
+            raise
+        finally:
+            ops = self._pending_ops
+            changes = self._changes
+            actions = self._commit_actions
+            undo_log = self._undo_log
+            self._pending_ops = None
+            self._rollback_log = None
+            self._changes = None
+            self._commit_actions = None
+            self._undo_log = None
+        if ops:
+            self._record(*ops)
+        if undo_log:
+            self._remember(undo_log)
+        elif self._undo_size > self.history.limit:
+            # Steps before a change that cannot be undone no longer line up with the tasks.
+            self.history.clear()
+        for action in actions:
+            action()
+        for kind in CHANGE_KINDS:
+            ids = [task_id for task_id, change in changes.items() if change == kind]
+            if ids:
+                self._notify(kind, ids)
+
+    @timed('task_manager.sync')
+    def sync(self):
+        """Merge in changes other instances saved to the shared storage.
+
+        Only the tasks that changed are updated, and listeners hear about
+        them as usual.  Returns the number of records applied, or None when
+        the storage could only say that something changed (listeners then
+        get a 'reset').
+        """
+        ops = self.storage.poll_changes(self.store)
+        if ops is None:
+            self._notify('reset', [])
+            return None
+        if ops:
+            with self.batch():
+                for op in ops:
+                    self._apply_external(op)
+        return len(ops)
+
+    def _apply_external(self, op):
+        kind = op.get('op')
+        if kind == 'add':
+            task = op['task']
+            old = self.store.get(task['id'])
+            if old is None or dict(old) != dict(task):
+                self.store.insert(task)
+                self.allocator.observe(task['id'])
+                self._changed('added' if old is None else 'updated', task['id'])
+        elif kind == 'set':
+            task = self.store.get(op['id'])
+            if task is not None and any(task.get(key) != value for key, value in op['fields'].items()):
+                self.store.update(op['id'], op['fields'])
+                self._changed('updated', op['id'])
+        elif kind == 'remove':
+            if self.store.delete(op['id']) is not None:
+                self._changed('removed', op['id'])
+
+    def finish_loading(self, limit=None):
+        """Build up to ``limit`` tasks' worth of deferred search index; True when done.
+
+        Searching works before this finishes, it just pays for the rest of
+        the index on the first search.
+        """
+        return self.store.finish_indexing(limit)
+
+    @timed('task_manager.flush')
+    def flush(self):
+        """Block until every change so far has been written."""
+        self.storage.flush()
+
+    def close(self):
+        self.storage.close()
+        self.archive.close()
 
     def generate_unique_id(self):
-        while True:
-            task_id = random.randint(1735, 8025)
-            if not any(task['id'] == task_id for task in self.tasks):
-                return task_id
+        task_id = self.allocator.allocate()
+        if self.allocator.dirty:
+            # Reserve under the storage lock so instances sharing the file
+            # never hand out the same block.
+            with self.storage.lock():
+                saved = self.storage.load_meta()
+                replacement = self.allocator.reconcile(saved.get('allocator'))
+                if replacement is not None:
+                    task_id = replacement
+                self.meta = saved
+                self.meta['allocator'] = self.allocator.state()
+                self.storage.save_meta(self.meta)
+            self.allocator.dirty = False
+        return task_id
 
+    @timed('task_manager.add_task')
     def add_task(self, name, priority, due_date):
+        """Add a TO DO task; returns its id, or False if a field is empty."""
         if not name or not priority or not due_date:
             return False
         
@@ -44,118 +281,376 @@ class TaskManager:
             'due_date': due_date,
             'status': 'TO DO'
         }
-        self.tasks.append(task)
-        self.save_tasks()
-        return True
+        self._insert(task)
+        return task['id']
+
+    def _insert(self, task, undoable=True):
+        self.store.insert(task)
+        self.allocator.observe(task['id'])
+        self._on_rollback(lambda: self._uninsert(task['id']))
+        self._record({'op': 'add', 'task': task})
+        if undoable:
+            self._log_inverse({'op': 'remove', 'id': task['id']})
+        self._changed('added', task['id'])
+
+    def _uninsert(self, task_id):
+        self.store.delete(task_id)
+        self.allocator.release(task_id)
 
     def get_tasks(self, status=None):
-        if status is None:
-            return self.tasks
-        return [task for task in self.tasks if task['status'] == status]
+        """Plain dict copies of the tasks (with ``status``, if given), safe to keep or serialize."""
+        tasks = self.store if status is None else self.store.with_status(status)
+        return [task.copy() for task in tasks]
     
     
    
     def get_task_by_id(self, task_id): 
-        for task in self.tasks: 
-            if task['id'] == task_id: 
-                return task 
-        return None  
+        task = self.store.get(task_id)
+        if task is None:
+            # Archived tasks are only known once the archive has been loaded.
+            task = self.archive.get(task_id)
+        return task
 
+    @timed('task_manager.update_task_status')
     def update_task_status(self, task_id, new_status):
-        for task in self.tasks:
-            if task['id'] == task_id:
-                task['status'] = new_status
-                self.save_tasks()
-                return True
-        return False
+        if task_id not in self.store:
+            return False
+        self._set_fields(task_id, {'status': new_status})
+        return True
+
+    def _set_fields(self, task_id, fields):
+        old = self.store.update(task_id, fields)
+        self._on_rollback(lambda: self.store.update(task_id, old))
+        self._record({'op': 'set', 'id': task_id, 'fields': fields})
+        self._log_inverse({'op': 'set', 'id': task_id, 'fields': old})
+        self._changed('updated', task_id)
+
+    @timed('task_manager.update_statuses')
+    def update_statuses(self, task_ids, new_status):
+        updated = 0
+        restored = []
+        with self.batch():
+            for task_id in dict.fromkeys(task_ids):
+                task = self.store.get(task_id)
+                if task is None:
+                    task = self.archive.get(task_id)
+                    if task is not None and task['status'] != new_status:
+                        self._restore(task, new_status)
+                        restored.append(task_id)
+                        updated += 1
+                elif task['status'] != new_status:
+                    self._set_fields(task_id, {'status': new_status})
+                    updated += 1
+            if restored:
+                self._on_commit(lambda: self._take_archived(restored, 'restored'))
+        return updated
 
     def remove_task(self, task_id):
-        self.tasks = [task for task in self.tasks if task['id'] != task_id]
-        self.save_tasks()
+        return self.remove_tasks([task_id])
 
-    def search_tasks(self, query):
-         
-        if not query:
-            return []
-
-       
-        search_terms = [term.strip().lower() for term in query.split('/')]
-
-       
-        def match_task(task):
-            for term in search_terms:
-                if (term in str(task['id']).lower() or
-                        term in task['name'].lower() or
-                        term in task['status'].lower()):
-                    return True
+    @timed('task_manager.remove_tasks')
+    def remove_tasks(self, task_ids):
+        removed = 0
+        archived = []
+        with self.batch():
+            for task_id in dict.fromkeys(task_ids):
+                if self._delete(task_id):
+                    removed += 1
+                elif self.archive.get(task_id) is not None:
+                    archived.append(task_id)
+                    # Undoing this brings the task back to the task list.
+                    self._log_inverse({'op': 'add', 'task': self.archive.get(task_id)})
+                    self._changed('removed', task_id)
+                    removed += 1
+            if archived:
+                self._on_commit(lambda: self._take_archived(archived))
+        return removed
+
+    def _delete(self, task_id):
+        task = self.store.delete(task_id)
+        if task is None:
             return False
+        self.allocator.release(task_id)
+        self._on_rollback(lambda: self._reinsert(task))
+        self._record({'op': 'remove', 'id': task_id})
+        # The removed task object is no longer changed, so the record can keep it.
+        self._log_inverse({'op': 'add', 'task': task})
+        self._changed('removed', task_id)
+        return True
 
-        
-        return [task for task in self.tasks if match_task(task)]
+    def _reinsert(self, task):
+        self.store.insert(task)
+        self.allocator.observe(task['id'])
+
+    @timed('task_manager.archive_completed')
+    def archive_completed(self, older_than_days):
+        """Move completed tasks due more than ``older_than_days`` days ago to the archive.
+
+        Tasks carry no completion date, so the due date stands in for age.
+        The archive is written first: after a crash part way through, a task
+        may be in both places, and the live copy wins.  Returns the number
+        of tasks archived.
+        """
+        cutoff = datetime.now().date().toordinal() - older_than_days - 1
+        tasks = [dict(task) for task in
+                 self.store.query(**self._query_args(status=ARCHIVED_STATUS, due_to=cutoff))]
+        if not tasks:
+            return 0
+        try:
+            self.archive.add(tasks)
+        except IOError as e:
+            self.storage.report_error(f"Error archiving tasks: {e}")
+            return 0
+        ids = [task['id'] for task in tasks]
+        with self.batch():
+            for task in tasks:
+                # The id stays taken: the task still exists, just not here.
+                self.store.delete(task['id'])
+                self._on_rollback(lambda task=task: self.store.insert(task))
+                self._record({'op': 'remove', 'id': task['id']})
+                self._changed('removed', task['id'])
+        self._notify('archived', ids)
+        return len(ids)
+
+    @timed('task_manager.load_archive')
+    def archived_tasks(self):
+        """All archived tasks, reading the archive segment on first use."""
+        store = self.archive.load()
+        # Left behind by a crash between writing the archive and the task list.
+        stale = [task_id for task_id in self.store.ids() if task_id in store]
+        if stale:
+            try:
+                self.archive.take(stale)
+            except IOError as e:
+                self.storage.report_error(f"Error updating archive: {e}")
+            else:
+                self.data_version += 1
+        return store.values()
 
-    def export_tasks(self, file_path):
+    def restore_tasks(self, task_ids, status='TO DO'):
+        """Move archived tasks back to the task list with ``status``; returns how many."""
+        return self.update_statuses(task_ids, status)
+
+    def _restore(self, task, status):
+        old_status = task['status']
+        task = dict(task, status=status)
+        if task['id'] in self.store:
+            # A range allocator may have handed the id out again.
+            task['id'] = self.generate_unique_id()
+        self._insert(task, undoable=False)
+        # Undo leaves the task in the list with its old status rather than
+        # archiving it again; the next archive run picks it up.
+        self._log_inverse({'op': 'set', 'id': task['id'], 'fields': {'status': old_status}})
+
+    def _take_archived(self, task_ids, kind=None):
+        # The task list must hold restored tasks on disk before the archive
+        # lets go of them, or a crash in between would lose them.
+        self.storage.flush()
         try:
-            with open(file_path, 'w') as f:
-                f.write("ID,Name,Priority,Due Date,Status\n")
-                for task in self.tasks:
-                    safe_name = task['name'].replace(',', ';')
-                    line = f"{task['id']},{safe_name},{task['priority']},{task['due_date']},{task['status']}\n"
-                    f.write(line)
-            return file_path  
+            self.archive.take(task_ids)
         except IOError as e:
+            self.storage.report_error(f"Error updating archive: {e}")
+            return
+        if kind is not None:
+            self._notify(kind, task_ids)
+        else:
+            self.data_version += 1
+
+    @timed('task_manager.undo')
+    def undo(self):
+        """Reverse the last change (a whole batch at once); False if there is none."""
+        return self._replay(self.history.pop_undo, self.history.push_undo, 'undo')
+
+    @timed('task_manager.redo')
+    def redo(self):
+        """Apply again the change the last ``undo`` reversed; False if there is none."""
+        return self._replay(self.history.pop_redo, self.history.push_redo, 'redo')
+
+    def _replay(self, pop, push_back, mode):
+        ops = pop()
+        if ops is None:
+            return False
+        self._replaying = mode
+        try:
+            # One batch: one write to storage and one notification per kind.
+            with self.batch():
+                for op in reversed(ops):
+                    self._apply_inverse(op)
+        except BaseException:
+            push_back(ops)
+            raise
+        finally:
+            self._replaying = None
+        return True
+
+    def _apply_inverse(self, op):
+        # Tasks may have changed since (another instance, the archive), so
+        # records that no longer apply are skipped.
+        kind = op['op']
+        if kind == 'add':
+            if op['task']['id'] not in self.store:
+                self._insert(op['task'])
+        elif kind == 'set':
+            task = self.store.get(op['id'])
+            if task is not None:
+                fields = {key: value for key, value in op['fields'].items() if task.get(key) != value}
+                if fields:
+                    self._set_fields(op['id'], fields)
+        elif kind == 'remove':
+            self._delete(op['id'])
+
+    def sorted_ids(self, field, reverse=False):
+        """Ids of all tasks ordered by ``field`` (dates and priorities by meaning, not text)."""
+        return self.store.sorted_ids(field, reverse)
+
+    def summary(self):
+        """Task totals kept up to date on every change, so this is cheap to call often.
+
+        Returns ``total``, ``by_status``, ``by_priority``, ``open_by_priority``
+        (tasks not yet completed) and ``by_status_priority`` counts, plus
+        ``overdue`` and ``due_this_week`` (due today or in the next six days)
+        counts of open tasks.
+        """
+        return self.store.summary(datetime.now().date().toordinal())
+
+    @timed('task_manager.search_tasks')
+    def search_tasks(self, query):
+        for results in self.iter_search(query):
+            pass
+        return results
+
+    def iter_search(self, query, chunk_size=50000):
+        """Run ``search_tasks`` in steps: yields None between steps, then the results.
+
+        A caller can stop iterating to drop a search that went stale.
+        Results are cached per query until the tasks change.  A query that
+        only narrows a cached one (``abc`` after ``ab``) filters that result
+        when it is small; larger ones are left to the store's index, which
+        is cheaper per match than re-checking every cached task.
+        """
+        if not query:
+            yield []
+            return
+        terms = search_terms(query)
+        version = self.data_version
+        results = self._search_cache.get(terms, version)
+        if results is None:
+            base = self._search_cache.narrowing_base(terms, version)
+            if base is not None and len(base) <= NARROW_LIMIT:
+                results = [task for task in base if matches_terms(task, terms)]
+            else:
+                for results in self.store.iter_search(list(terms), chunk_size):
+                    if results is None:
+                        yield None
+                if self.data_version != version:
+                    # Tasks changed between steps; finish in one go instead.
+                    version = self.data_version
+                    results = self.store.search(list(terms))
+            self._search_cache.put(terms, version, results)
+        yield results
+
+    @timed('task_manager.query')
+    def query(self, status=None, priority=None, due_from=None, due_to=None, name=None,
+              exclude_status=None, archived=False):
+        """Filter tasks by status, priority, an inclusive due date range and name.
+
+        ``status``, ``priority`` and ``exclude_status`` take one value or a
+        list of values.  Due dates may be mm-dd-yyyy strings or dates.
+        Archived tasks are searched too when ``archived`` is true.
+        """
+        args = self._query_args(status, priority, due_from, due_to, name, exclude_status)
+        tasks = self.store.query(**args)
+        if archived:
+            self.archived_tasks()
+            tasks = list(heapq.merge(tasks, self.archive.store.query(**args), key=itemgetter('id')))
+        return tasks
+
+    def query_matcher(self, query):
+        """A ``task -> bool`` check for search box text, as ``query`` or ``search_tasks`` would match it.
+
+        Raises ValueError like ``parse_query`` for a malformed filter.
+        """
+        filters = parse_query(query)
+        if filters is None:
+            terms = search_terms(query)
+            return lambda task: matches_terms(task, terms)
+        filters.pop('archived', None)
+        return filter_matcher(**self._query_args(**filters))
+
+    def _query_args(self, status=None, priority=None, due_from=None, due_to=None, name=None,
+                    exclude_status=None):
+        return {'status': as_list(status),
+                'priority': as_list(priority),
+                'due_from': to_day(due_from),
+                'due_to': to_day(due_to),
+                'name': name.lower() if name else None,
+                'exclude_status': as_list(exclude_status)}
+
+    def export_source(self, filters=None):
+        """Tasks to export, optionally narrowed by ``query`` filters.
+
+        The result may be consumed on a worker thread: it holds copies, or
+        (with SQLite) rows read through a separate connection.
+        """
+        if filters:
+            filters = dict(filters)
+            if filters.pop('archived', False):
+                return [task.copy() for task in self.query(archived=True, **filters)]
+            return self.store.snapshot(**self._query_args(**filters))
+        return self.store.snapshot()
+
+    @timed('task_manager.export_tasks')
+    def export_tasks(self, file_path, fmt=None, compress=None, filters=None, tasks=None,
+                     progress=None, cancelled=None):
+        """Write tasks as CSV or JSON Lines, gzipped when the name ends in .gz.
+
+        Exports everything unless ``filters`` (``query`` arguments) or an
+        explicit ``tasks`` iterable is given.
+        """
+        if tasks is None:
+            tasks = self.export_source(filters)
+        try:
+            return write_export(tasks, file_path, fmt, compress, progress, cancelled)
+        except (IOError, ValueError) as e:
             print(f"Error exporting tasks: {e}")
             return None
 
     
-   
-
-    def update_task_status(self, task_id, new_status):
-        for task in self.tasks:
-            if task['id'] == task_id:
-                task['status'] = new_status
-                self.save_tasks()
-                return True
-        return False
-    
-    
+    @timed('task_manager.update_task_details')
     def update_task_details(self, task_id, name, priority, due_date):
-        task = self.get_task_by_id(task_id)
+        task = self.store.get(task_id)
         if task:
-            task['name'] = name
-            task['priority'] = priority
-            task['due_date'] = due_date
-            self.save_tasks()
+            self._set_fields(task_id, {'name': name, 'priority': priority, 'due_date': due_date})
             return True
         return False
 
-    def import_tasks(self, import_filename='tasks_import.csv'):
-        if not os.path.exists(import_filename):
-            print(f"Error: File '{import_filename}' not found.")
-            return False
+    @timed('task_manager.read_import')
+    def read_import(self, import_filename, progress=None, cancelled=None, chunk_size=1000):
+        """Parse a CSV export without touching the task list.
 
-        try:
-            with open(import_filename, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    try:
-                        task = {
-                            'id': int(row['ID']),
-                            'name': row['Name'],
-                            'priority': row['Priority'],
-                            'due_date': row['Due Date'],
-                            'status': row['Status']
-                        }
-
-                        if not any(task['id'] == t['id'] for t in self.tasks):
-                            self.tasks.append(task)
-                        else:
-                            print(f"Task with ID {task['id']} already exists.")
-                    except ValueError as e:
-                        print(f"Error parsing task: {e}")
-                        continue
-
-            self.save_tasks() 
-            return True
-        except IOError as e:
-            print(f"Error importing tasks: {e}")
-            return False   
\ No newline at end of file
+        Safe to call from a worker thread.  Returns ``(tasks, report)``; pass
+        both to ``commit_import`` on the owning thread to apply them.
+        """
+        report = ImportReport(import_filename)
+        tasks = []
+        for chunk in read_csv_tasks(import_filename, report, chunk_size, progress, cancelled):
+            tasks.extend(chunk)
+        return tasks, report
+
+    @timed('task_manager.commit_import')
+    def commit_import(self, tasks, report):
+        with self.batch():
+            for task in tasks:
+                if task['id'] in self.store:
+                    report.duplicates.append(task['id'])
+                else:
+                    self._insert(task)
+                    report.imported += 1
+        return report
+
+    @timed('task_manager.import_tasks')
+    def import_tasks(self, import_filename='tasks_import.csv', progress=None, cancelled=None):
+        tasks, report = self.read_import(import_filename, progress, cancelled)
+        if report:
+            self.commit_import(tasks, report)
+        return report
@@ -0,0 +1,78 @@
+import sys
+from collections.abc import MutableMapping
+
+FIELDS = ('id', 'name', 'priority', 'due_date', 'status')
+FIELD_SET = frozenset(FIELDS)
+# Values drawn from a handful of choices; interning makes every task share
+# one string object per distinct value instead of one copy per task.
+INTERNED = frozenset(('priority', 'due_date', 'status'))
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Task(MutableMapping):
+    """A task stored in ``__slots__`` that still behaves like the old dict.
+
+    ``task['name']``, ``task.get(...)``, ``task.update(...)`` and ``dict(task)``
+    all work, so the UI and storage code do not need to know the difference.
+    Keys other than the five standard fields are kept in ``extra``.
+    """
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, id, name, priority, due_date, status, extra=None):
+        self.id = id
+        self.name = name
+        self.priority = _intern(priority)
+        self.due_date = _intern(due_date)
+        self.status = _intern(status)
+        self.extra = extra
+
+    @classmethod
+    def from_mapping(cls, data):
+        if isinstance(data, cls):
+            return data
+        extra = {key: value for key, value in data.items() if key not in FIELD_SET}
+        return cls(data['id'], data['name'], data['priority'], data['due_date'], data['status'],
+                   extra or None)
+
+    def __getitem__(self, key):
+        if key in FIELD_SET:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in FIELD_SET:
+            setattr(self, key, _intern(value) if key in INTERNED else value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in FIELD_SET or self.extra is None:
+            raise KeyError(key)
+        del self.extra[key]
+
+    def __iter__(self):
+        yield from FIELDS
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return len(FIELDS) + (len(self.extra) if self.extra else 0)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def copy(self):
+        # Read the slots directly; dict(self) goes through the mapping protocol key by key.
+        data = {'id': self.id, 'name': self.name, 'priority': self.priority,
+                'due_date': self.due_date, 'status': self.status}
+        if self.extra:
+            data.update(self.extra)
+        return data
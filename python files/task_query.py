@@ -0,0 +1,172 @@
+import shlex
+from datetime import date, datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=8192)
+def due_key(due_date):
+    """Parse an mm-dd-yyyy due date into a sortable day number, or None."""
+    try:
+        month, day, year = (int(part) for part in due_date.split('-'))
+        return date(year, month, day).toordinal()
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+PRIORITY_RANKS = {'low': 0, 'medium': 1, 'high': 2}
+STATUS_RANKS = {'to do': 0, 'in progress': 1, 'completed': 2}
+
+
+def _ranked(ranks):
+    def key(value):
+        text = str(value).lower()
+        return ranks.get(text, len(ranks)), text
+    return key
+
+
+def _due_sort_key(due_date):
+    day = due_key(due_date)
+    return (1, 0) if day is None else (0, day)
+
+
+# Typed sort keys per task field: dates by day, priority and status by
+# their natural order, unknown values after the known ones.
+SORT_KEYS = {
+    'id': lambda task_id: task_id,
+    'name': lambda name: str(name).lower(),
+    'priority': _ranked(PRIORITY_RANKS),
+    'due_date': _due_sort_key,
+    'status': _ranked(STATUS_RANKS),
+}
+
+
+def to_day(value):
+    """Accept a day number, a date/datetime or an mm-dd-yyyy string."""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    day = due_key(value)
+    if day is None:
+        raise ValueError(f"Invalid date '{value}', expected mm-dd-yyyy")
+    return day
+
+
+def as_list(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+DUE_OPERATORS = ('<=', '>=', '<', '>', ':', '=')
+
+
+def parse_query(text):
+    """Turn search box syntax into keyword arguments for ``TaskManager.query``.
+
+    Understands ``status:VALUE``, ``status:!VALUE``, ``priority:VALUE`` (comma
+    separated values allowed), ``due<DATE``, ``due<=DATE``, ``due>DATE``,
+    ``due>=DATE``, ``due:DATE``, ``name:TEXT`` and ``archived:yes`` (search
+    archived tasks too); any other words are matched against the task name.
+    Quote values that contain spaces, e.g. ``status:"IN PROGRESS"``.  Returns
+    None when the text uses none of these filters, so callers can fall back
+    to the plain ``search_tasks``.
+    """
+    try:
+        tokens = shlex.split(text)
+    except ValueError:
+        tokens = text.split()
+
+    filters = {}
+    words = []
+    structured = False
+    for token in tokens:
+        key, _, value = token.partition(':')
+        key = key.lower()
+        if value and key in ('status', 'priority'):
+            structured = True
+            if value.startswith('!'):
+                filters.setdefault('exclude_' + key, []).extend(v.strip() for v in value[1:].split(','))
+            else:
+                filters.setdefault(key, []).extend(v.strip() for v in value.split(','))
+            continue
+        if value and key == 'name':
+            structured = True
+            words.append(value)
+            continue
+        if value and key == 'archived':
+            structured = True
+            filters['archived'] = value.lower() in ('yes', 'true', '1')
+            continue
+        if token.lower().startswith('due'):
+            rest = token[3:]
+            operator = next((op for op in DUE_OPERATORS if rest.startswith(op)), None)
+            if operator is not None and rest[len(operator):]:
+                structured = True
+                day = to_day(rest[len(operator):])
+                if operator in ('<', '<='):
+                    bound = day - 1 if operator == '<' else day
+                    filters['due_to'] = min(bound, filters.get('due_to', bound))
+                elif operator in ('>', '>='):
+                    bound = day + 1 if operator == '>' else day
+                    filters['due_from'] = max(bound, filters.get('due_from', bound))
+                else:
+                    filters['due_from'] = filters['due_to'] = day
+                continue
+        words.append(token)
+
+    if not structured:
+        return None
+    if words:
+        filters['name'] = ' '.join(words)
+    return filters
+
+
+def filter_matcher(status=None, priority=None, due_from=None, due_to=None, name=None,
+                   exclude_status=None):
+    """A ``task -> bool`` check for the filters ``TaskStore.query`` takes."""
+    statuses = None if status is None else {value.lower() for value in status}
+    excluded = None if exclude_status is None else {value.lower() for value in exclude_status}
+    priorities = None if priority is None else {value.lower() for value in priority}
+    check_due = due_from is not None or due_to is not None
+
+    def matches(task):
+        if statuses is not None and task['status'].lower() not in statuses:
+            return False
+        if excluded is not None and task['status'].lower() in excluded:
+            return False
+        if priorities is not None and str(task['priority']).lower() not in priorities:
+            return False
+        if check_due:
+            day = due_key(task['due_date'])
+            if day is None or (due_from is not None and day < due_from) or \
+                    (due_to is not None and day > due_to):
+                return False
+        return not name or name in task['name'].lower()
+    return matches
+
+
+def search_terms(query):
+    """Split search box text on '/' into a tuple of lower-cased terms."""
+    return tuple(term.strip().lower() for term in query.split('/'))
+
+
+def matches_terms(task, terms):
+    """The ``search`` rule: id, name or status contains any of the lower-cased ``terms``."""
+    for term in terms:
+        if term in task['name'].lower() or term in task['status'].lower() or term in str(task['id']):
+            return True
+    return False
+
+
+def narrows(previous, terms):
+    """True if every task matching ``terms`` also matched ``previous``.
+
+    That holds when both have the same number of terms and each new term
+    contains the one it replaces, as when a word is typed further.
+    """
+    return len(previous) == len(terms) and all(old in new for old, new in zip(previous, terms))
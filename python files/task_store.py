@@ -0,0 +1,252 @@
+from datetime import date
+
+from search_index import BucketIndex, CountIndex, NgramIndex, SortedIndex
+from task_model import Task
+from task_query import SORT_KEYS, due_key, filter_matcher
+
+
+class TaskStore:
+    """In-memory task table indexed by id, status, priority, due date and name.
+
+    ``by_id`` keeps insertion order, so iterating the store yields tasks in the
+    same order the old ``tasks`` list did.  Every mutation goes through
+    ``insert``, ``update`` and ``delete`` so the secondary ``indexes`` never
+    drift from the table.  An index is any object with ``fields``,
+    ``add(task)``, ``discard(task)`` and ``clear()``, plus an optional
+    ``rebuild(tasks)`` used for bulk loads.  Tasks are stored as compact
+    ``Task`` objects; plain dicts handed in are converted on the way.
+    ``version`` goes up with every mutation.  ``counts`` keeps the running
+    totals behind ``summary``.
+
+    A reset builds only what the first screen needs: ``by_id``, the status
+    buckets and ``counts``.  The priority and due date indexes, which only
+    ``query`` reads, and the n-gram index are filled in afterwards through
+    ``finish_indexing``, or by the first query or text search that needs
+    them.
+    """
+
+    def __init__(self, tasks=()):
+        self.by_id = {}
+        self.status_index = BucketIndex('status')
+        self.priority_index = BucketIndex('priority')
+        self.due_index = SortedIndex('due_date', due_key)
+        self.ngrams = NgramIndex()
+        self.counts = CountIndex(due_key, date.today().toordinal())
+        self.indexes = [self.status_index, self.ngrams, self.counts]
+        self.pending_indexes = []
+        self.sort_indexes = {}
+        self.sorted_orders = {}
+        self.version = 0
+        self.reset(tasks)
+
+    @property
+    def by_status(self):
+        return self.status_index.buckets
+
+    def reset(self, tasks):
+        self.version += 1
+        self.by_id = {}
+        for task in tasks:
+            task = Task.from_mapping(task)
+            self.by_id[task.id] = task
+        for index in (self.priority_index, self.due_index):
+            if index in self.indexes:
+                self.indexes.remove(index)
+            index.clear()
+        self.pending_indexes = [self.priority_index, self.due_index]
+        for index in self.indexes:
+            if hasattr(index, 'defer'):
+                index.defer(self.by_id)
+            elif hasattr(index, 'rebuild'):
+                index.rebuild(self.by_id.values())
+            else:
+                index.clear()
+                for task in self.by_id.values():
+                    index.add(task)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def __contains__(self, task_id):
+        return task_id in self.by_id
+
+    def values(self):
+        return list(self.by_id.values())
+
+    def ids(self):
+        return list(self.by_id)
+
+    def snapshot(self, **filters):
+        """Copies of the tasks matching ``filters``, safe to read on other threads.
+
+        The copies are plain dicts taken on the calling thread, so edits made
+        while a worker reads them cannot show up half applied.
+        """
+        return [task.copy() for task in (self.query(**filters) if filters else self.values())]
+
+    def get(self, task_id):
+        return self.by_id.get(task_id)
+
+    def with_status(self, status):
+        return list(self.by_status.get(status, {}).values())
+
+    def count(self, status=None):
+        if status is None:
+            return len(self.by_id)
+        return len(self.by_status.get(status, ()))
+
+    def insert(self, task):
+        self.version += 1
+        task = Task.from_mapping(task)
+        old = self.by_id.get(task['id'])
+        if old is not None:
+            for index in self.indexes:
+                index.discard(old)
+        self.by_id[task['id']] = task
+        for index in self.indexes:
+            index.add(task)
+
+    def update(self, task_id, fields):
+        """Apply ``fields`` to a task and return the values they replaced."""
+        task = self.by_id.get(task_id)
+        if task is None:
+            return None
+        self.version += 1
+        old = {key: task.get(key) for key in fields}
+        touched = [index for index in self.indexes
+                   if any(key in fields and fields[key] != old[key] for key in index.fields)]
+        for index in touched:
+            index.discard(task)
+        task.update(fields)
+        for index in touched:
+            index.add(task)
+        return old
+
+    def delete(self, task_id):
+        task = self.by_id.pop(task_id, None)
+        if task is not None:
+            self.version += 1
+            for index in self.indexes:
+                index.discard(task)
+        return task
+
+    def summary(self, today):
+        """Task totals as of day number ``today``; see ``CountIndex.summary``."""
+        self.counts.set_today(today)
+        return self.counts.summary()
+
+    def finish_indexing(self, limit=None):
+        """Index up to ``limit`` tasks left over from ``reset``; True when done.
+
+        With a ``limit`` each call builds one deferred query index or one
+        slice of the n-gram backlog, so a caller can spread the work out.
+        """
+        if self.pending_indexes:
+            self._build_pending(1 if limit is not None else None)
+            if limit is not None:
+                return False
+        return self.ngrams.index_pending(self.by_id.get, limit)
+
+    def _build_pending(self, count=None):
+        while self.pending_indexes and count != 0:
+            index = self.pending_indexes.pop(0)
+            if hasattr(index, 'rebuild'):
+                index.rebuild(self.by_id.values())
+            else:
+                for task in self.by_id.values():
+                    index.add(task)
+            self.indexes.append(index)
+            if count is not None:
+                count -= 1
+
+    def sorted_ids(self, field, reverse=False):
+        """All task ids ordered by ``field`` using the typed ``SORT_KEYS``.
+
+        The first call for a field builds a SortedIndex that mutations then
+        keep up to date; the id list per field and direction is cached until
+        the next mutation, so treat it as read-only.
+        """
+        cached = self.sorted_orders.get((field, reverse))
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        index = self.sort_indexes.get(field)
+        if index is None:
+            index = self.sort_indexes[field] = SortedIndex(field, SORT_KEYS[field])
+            index.rebuild(self.by_id.values())
+            self.indexes.append(index)
+        ids = [task_id for _, task_id in index.entries]
+        if reverse:
+            ids.reverse()
+        self.sorted_orders[(field, reverse)] = (self.version, ids)
+        return ids
+
+    def search(self, terms):
+        """Return tasks whose id, name or status contains any of ``terms``.
+
+        Terms must already be lower-cased.  Results come back in id order.
+        """
+        for results in self.iter_search(terms):
+            pass
+        return results
+
+    def iter_search(self, terms, chunk_size=50000):
+        """``search`` in steps: yields None after every ``chunk_size`` candidates, then the results."""
+        self.finish_indexing()
+        matched = set()
+        checked = 0
+        for term in terms:
+            if not term:
+                yield self.values()
+                return
+            for status, bucket in self.by_status.items():
+                if term in status.lower():
+                    matched.update(bucket)
+            for task_id in self.ngrams.candidates(term):
+                checked += 1
+                if checked % chunk_size == 0:
+                    yield None
+                if task_id in matched:
+                    continue
+                task = self.by_id.get(task_id)
+                if task is not None and (term in str(task_id).lower() or term in task['name'].lower()):
+                    matched.add(task_id)
+        by_id = self.by_id
+        yield [by_id[task_id] for task_id in sorted(matched) if task_id in by_id]
+
+    def query(self, status=None, priority=None, due_from=None, due_to=None, name=None,
+              exclude_status=None):
+        """Return tasks matching every given filter, in id order.
+
+        ``status``, ``priority`` and ``exclude_status`` are lists of values
+        compared case-insensitively, ``due_from``/``due_to`` are inclusive day
+        numbers from ``due_key`` and ``name`` is a lower-cased substring.  The
+        smallest matching index drives the scan; the other filters are checked
+        per candidate.
+        """
+        if self.pending_indexes:
+            self._build_pending()
+        sources = [(len(self.by_id), lambda: self.by_id)]
+        if status is not None:
+            status_buckets = self.status_index.matching(status)
+            sources.append((sum(map(len, status_buckets)),
+                            lambda: (i for bucket in status_buckets for i in bucket)))
+        if priority is not None:
+            priority_buckets = self.priority_index.matching(priority)
+            sources.append((sum(map(len, priority_buckets)),
+                            lambda: (i for bucket in priority_buckets for i in bucket)))
+        if due_from is not None or due_to is not None:
+            sources.append((self.due_index.count_range(due_from, due_to),
+                            lambda: self.due_index.ids_in_range(due_from, due_to)))
+        if name:
+            self.finish_indexing()
+            candidates = self.ngrams.candidates(name)
+            sources.append((len(candidates), lambda: candidates))
+        _, driver = min(sources, key=lambda source: source[0])
+
+        matches = filter_matcher(status, priority, due_from, due_to, name, exclude_status)
+        by_id = self.by_id
+        matched = [task_id for task_id in driver() if matches(by_id[task_id])]
+        return [by_id[task_id] for task_id in sorted(matched)]
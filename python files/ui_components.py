@@ -1,9 +1,138 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from tkcalendar import DateEntry
 from datetime import datetime
 from tkinter import filedialog 
 import os
+import threading
+from task_query import parse_query
+from task_export import FILE_TYPES, with_extension
+from task_list import TaskList
+from instrumentation import STATS, timed
+
+# Typing pauses shorter than this do not start a search.
+SEARCH_DELAY_MS = 250
+# Overdue counts change at midnight without any edit, so the summary also refreshes on a timer.
+SUMMARY_REFRESH_MS = 60000
+REMINDER_NAMES = 3
+
+class ProgressDialog(tk.Toplevel):
+    """Runs ``work(progress, cancelled)`` on a worker thread behind a progress bar.
+
+    The worker reports through ``progress(done, total)`` and should stop once
+    ``cancelled()`` is True.  ``on_done(result, error)`` is called back on the
+    Tk thread when it finishes.
+    """
+
+    def __init__(self, parent, title, work, on_done):
+        super().__init__(parent)
+        self.title(title)
+        self.transient(parent)
+        self.resizable(False, False)
+        self.configure(bg="gray63")
+
+        self.label = tk.Label(self, text=f"{title}...", background="gray63", font=("Helvetica", 10, "bold"))
+        self.bar = ttk.Progressbar(self, length=320, maximum=1.0)
+        self.cancel_button = tk.Button(self, text="Cancel", background="gray70", command=self.cancel)
+        self.label.grid(row=0, column=0, padx=20, pady=(12, 4), sticky="w")
+        self.bar.grid(row=1, column=0, padx=20, pady=4, sticky="ew")
+        self.cancel_button.grid(row=2, column=0, padx=20, pady=(4, 12), sticky="e")
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        self.on_done = on_done
+        self.fraction = 0.0
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.worker = threading.Thread(target=self.run, args=(work,), daemon=True)
+        self.worker.start()
+        self.poll_job = self.after(100, self.poll)
+
+    def run(self, work):
+        try:
+            self.result = work(self.set_progress, self.cancel_event.is_set)
+        except Exception as e:
+            self.error = e
+
+    def set_progress(self, done, total):
+        self.fraction = done / total if total else 1.0
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.label.config(text="Cancelling...")
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def poll(self):
+        self.bar["value"] = self.fraction
+        if self.worker.is_alive():
+            self.poll_job = self.after(100, self.poll)
+            return
+        self.poll_job = None
+        self.destroy()
+        self.on_done(self.result, self.error)
+
+    def destroy(self):
+        if self.poll_job is not None:
+            self.after_cancel(self.poll_job)
+            self.poll_job = None
+        super().destroy()
+
+
+class DiagnosticsWindow(tk.Toplevel):
+    """Live view of the ``instrumentation.STATS`` counters, refreshed every second."""
+
+    COLUMNS = ("Calls", "Total ms", "Mean ms", "p50 ms", "p95 ms", "Max ms")
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Diagnostics")
+        self.geometry("720x360")
+        self.configure(bg="gray63")
+
+        self.recording = tk.BooleanVar(value=STATS.enabled)
+        self.record_check = tk.Checkbutton(self, text="Record timings", variable=self.recording,
+                                           background="gray63", command=self.on_toggle)
+        self.reset_button = tk.Button(self, text="Reset", background="gray70", command=STATS.reset)
+        self.table = ttk.Treeview(self, columns=self.COLUMNS)
+        self.table.heading("#0", text="Operation", anchor=tk.W)
+        self.table.column("#0", width=220, stretch=True)
+        for col in self.COLUMNS:
+            self.table.heading(col, text=col, anchor=tk.E)
+            self.table.column(col, width=70, anchor=tk.E, stretch=False)
+        self.bytes_label = tk.Label(self, background="gray63", anchor="w", justify="left")
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+        self.record_check.grid(row=0, column=0, padx=12, pady=8, sticky="w")
+        self.reset_button.grid(row=0, column=1, padx=12, pady=8, sticky="e")
+        self.table.grid(row=1, column=0, columnspan=2, padx=12, sticky="nsew")
+        self.bytes_label.grid(row=2, column=0, columnspan=2, padx=12, pady=8, sticky="ew")
+        self.refresh_job = None
+        self.refresh()
+
+    def on_toggle(self):
+        if self.recording.get():
+            STATS.enable()
+        else:
+            STATS.disable()
+
+    def refresh(self):
+        snapshot = STATS.snapshot()
+        self.table.delete(*self.table.get_children())
+        for name, op in sorted(snapshot['ops'].items()):
+            self.table.insert("", "end", text=name, values=(
+                op['calls'], f"{op['total_ms']:.1f}", f"{op['mean_ms']:.2f}",
+                f"{op['p50_ms']:.2f}", f"{op['p95_ms']:.2f}", f"{op['max_ms']:.2f}"))
+        written = ", ".join(f"{name}: {count / 1024:.1f} KB"
+                            for name, count in sorted(snapshot['bytes_written'].items()))
+        self.bytes_label.config(text=f"Bytes written: {written or 'none yet'}")
+        self.refresh_job = self.after(1000, self.refresh)
+
+    def destroy(self):
+        if self.refresh_job is not None:
+            self.after_cancel(self.refresh_job)
+            self.refresh_job = None
+        super().destroy()
+
 
 class Sidebar(tk.Frame):
     def __init__(self, parent, task_manager, main_frame):
@@ -15,6 +144,10 @@ class Sidebar(tk.Frame):
 
         self.create_widgets()
         self.layout_widgets()
+        self.after_idle(self.create_date_entry)
+        self.task_manager.subscribe(lambda kind, task_ids: self.update_summary())
+        self.summary_job = None
+        self.refresh_summary()
         
     
         
@@ -27,10 +160,13 @@ class Sidebar(tk.Frame):
         self.priority = tk.Label(self, text="Priority:", background="gray63", font=("Helvetica", 10, "bold"))
         self.priority_combo = ttk.Combobox(self, values=["Low", "Medium", "High"])
         self.due_date = tk.Label(self, text="Due date:", background="gray63", font=("Helvetica", 10, "bold"))
-        self.date_entry = DateEntry(self, selectmode="day", date_pattern="mm-dd-yyyy")
+        self.date_entry = None
         self.add_task = tk.Button(self, text="Add task", background="dodgerblue2", command=self.on_add_task)
         self.export = tk.Button(self, text="Save", background="gray70", command=self.on_export)
         self.import_button = tk.Button(self, text="Load", background="gray70", command=self.on_import)  
+        self.summary = tk.Label(self, background="gray63", justify="left", anchor="nw", font=("Helvetica", 9))
+        self.reminder = tk.Label(self, background="gray63", justify="left", anchor="sw", wraplength=300,
+                                 font=("Helvetica", 9, "bold"))
         
 
 
@@ -46,15 +182,54 @@ class Sidebar(tk.Frame):
         self.priority.grid(row=3, column=0, padx=20, sticky="w")
         self.priority_combo.grid(row=4, column=0, columnspan=2, padx=20, pady=8, sticky="nsew")
         self.due_date.grid(row=5, column=0, padx=20, sticky="w")
-        self.date_entry.grid(row=6, column=0, columnspan=2, padx=20, pady=8, sticky="nsew")
         self.add_task.grid(row=7, column=0, columnspan=2, padx=20, pady=8, sticky="ew")
+        self.summary.grid(row=8, column=0, columnspan=2, padx=20, pady=12, sticky="new")
+        self.reminder.grid(row=8, column=0, columnspan=2, padx=20, pady=12, sticky="sew")
         self.export.grid(row=9, column=0, columnspan=1, padx=20, pady=0, sticky="ew")
         self.import_button.grid(row=10, column=0, columnspan=1, padx=20, pady=8, sticky="ew") 
 
+    def update_summary(self):
+        summary = self.task_manager.summary()
+        by_status = summary['by_status']
+        open_by_priority = summary['open_by_priority']
+        self.summary.config(text=(
+            f"To do: {by_status.get('TO DO', 0)}    In progress: {by_status.get('IN PROGRESS', 0)}"
+            f"    Completed: {by_status.get('COMPLETED', 0)}\n"
+            f"Open by priority: High {open_by_priority.get('High', 0)}, "
+            f"Medium {open_by_priority.get('Medium', 0)}, Low {open_by_priority.get('Low', 0)}\n"
+            f"Overdue: {summary['overdue']}    Due this week: {summary['due_this_week']}"))
+
+    def show_reminder(self, kind, task_ids):
+        get_task = self.task_manager.get_task_by_id
+        names = [get_task(task_id)['name'] for task_id in task_ids[:REMINDER_NAMES]]
+        more = len(task_ids) - len(names)
+        if more:
+            names.append(f"and {more} more")
+        label = "Overdue" if kind == 'overdue' else "Due soon"
+        self.reminder.config(text=f"{label} ({len(task_ids)}): " + ", ".join(names),
+                             foreground="darkred" if kind == 'overdue' else "navy")
+
+    def refresh_summary(self):
+        self.update_summary()
+        self.summary_job = self.after(SUMMARY_REFRESH_MS, self.refresh_summary)
+
+    def destroy(self):
+        if self.summary_job is not None:
+            self.after_cancel(self.summary_job)
+            self.summary_job = None
+        super().destroy()
+
+    def create_date_entry(self):
+        # tkcalendar (and babel behind it) is slow to import; load it after the first paint.
+        if self.date_entry is None:
+            from tkcalendar import DateEntry
+            self.date_entry = DateEntry(self, selectmode="day", date_pattern="mm-dd-yyyy")
+            self.date_entry.grid(row=6, column=0, columnspan=2, padx=20, pady=8, sticky="nsew")
 
         
 
     def on_add_task(self):
+        self.create_date_entry()
         name = self.name_entry.get()
         priority = self.priority_combo.get()
         due_date = self.date_entry.get()
@@ -63,56 +238,96 @@ class Sidebar(tk.Frame):
             self.name_entry.delete(0, tk.END)
             self.priority_combo.set('')
             self.date_entry.set_date(datetime.now())
-            self.main_frame.update_task_views()
         else:
             messagebox.showerror("Error", "Please fill in all task details")
 
     def on_export(self):
+        file_type = tk.StringVar(self, value=FILE_TYPES[0][0])
         export_filename = filedialog.asksaveasfilename(
             title="Save tasks as",
-            defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            filetypes=[(label, "*" + extension) for label, extension in FILE_TYPES] + [("All files", "*.*")],
+            typevariable=file_type,
             initialdir=os.path.expanduser("~/Documents")  
         )
         
         if export_filename: 
-            print("Saving to:", export_filename) 
-            exported_file = self.task_manager.export_tasks(export_filename)
-            
-            if exported_file:
-                messagebox.showinfo("Export Successful", f"Tasks exported to {exported_file}")
-            else:
-                messagebox.showerror("Export Error", "There was an error exporting the tasks.")
+            export_filename = with_extension(export_filename, file_type.get())
+            query = self.main_frame.search_entry.get()
+            filters = None
+            tasks = None
+            if query and query != self.main_frame.placeholder_text and \
+                    messagebox.askyesno("Export", "Export only the tasks matching the current search?"):
+                try:
+                    filters = parse_query(query)
+                except ValueError as e:
+                    messagebox.showerror("Export Error", str(e))
+                    return
+                if filters is None:
+                    # Copied here: the worker must not read tasks the UI may edit.
+                    tasks = [task.copy() for task in self.task_manager.search_tasks(query)]
+            if tasks is None:
+                tasks = self.task_manager.export_source(filters)
+
+            dialog = ProgressDialog(
+                self, "Exporting tasks",
+                lambda progress, cancelled: self.task_manager.export_tasks(
+                    export_filename, tasks=tasks, progress=progress, cancelled=cancelled),
+                lambda result, error: self.on_export_done(result, error, dialog.cancel_event.is_set()))
+
+    def on_export_done(self, exported_file, error, cancelled):
+        if cancelled:
+            messagebox.showinfo("Export Cancelled", "No file was written.")
+        elif exported_file and error is None:
+            messagebox.showinfo("Export Successful", f"Tasks exported to {exported_file}")
+        else:
+            messagebox.showerror("Export Error", "There was an error exporting the tasks.")
 
 
     
     def on_import(self):  
         import_filename = filedialog.askopenfilename(title="Select a CSV file to import", filetypes=[("CSV files", "*.csv")])
         if import_filename:
-            import_result = self.task_manager.import_tasks(import_filename)
-            if import_result:
-                messagebox.showinfo("Import Successful", f"Tasks imported from {import_filename}")
-                self.main_frame.update_task_views()
-            else:
-                messagebox.showerror("Error", "Import failed or file is empty.")
+            ProgressDialog(self, "Importing tasks",
+                           lambda progress, cancelled: self.task_manager.read_import(import_filename, progress, cancelled),
+                           self.on_import_done)
+
+    def on_import_done(self, result, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Import failed: {error}")
+            return
+        tasks, report = result
+        if report.cancelled:
+            messagebox.showinfo("Import Cancelled", "No tasks were imported.")
+        elif report.error is not None:
+            messagebox.showerror("Error", report.error)
+        else:
+            self.task_manager.commit_import(tasks, report)
+            messagebox.showinfo("Import Successful", report.summary())
                 
     
 
 class Main(ttk.Frame):
-    def __init__(self, parent, task_manager):
+    def __init__(self, parent, task_manager, virtual=False):
         super().__init__(parent)
         self.task_manager = task_manager
+        self.virtual = virtual
         self.place(relx=0.28, y=0, relwidth=0.72, relheight=1)
         
     
         self.sort_column_name = None
         self.sort_reverse = False 
+        self.filtered = False
+        self.search_query = None
+        self.search_match = None
+        self.search_job = None
         
         self.create_widgets()
         self.layout_widgets()
+        self.task_manager.subscribe(self.on_tasks_changed)
 
     def create_widgets(self):
-        self.search_entry = ttk.Entry(self)
+        self.search_text = tk.StringVar(self)
+        self.search_entry = ttk.Entry(self, textvariable=self.search_text)
         self.placeholder_text = "Search task id, name, or status (to search a specific task: id/name/status)"
 
         self.search_entry.insert(0, self.placeholder_text)
@@ -120,6 +335,7 @@ class Main(ttk.Frame):
 
         self.search_entry.bind("<FocusIn>", self.on_entry_focus)
         self.search_entry.bind("<FocusOut>", self.on_entry_focus_out)
+        self.search_text.trace_add("write", self.on_search_typed)
         
         self.search_button = tk.Button(self, text="Search tasks", background="dodgerblue2", command=self.on_search)
         
@@ -130,17 +346,26 @@ class Main(ttk.Frame):
         self.tab2 = tk.Frame(self.manager)
         self.tab3 = tk.Frame(self.manager)
         self.tab4 = tk.Frame(self.manager)
+        self.tab5 = tk.Frame(self.manager)
 
         self.manager.add(self.tab1, text="ALL")
         self.manager.add(self.tab2, text="TO DO")
         self.manager.add(self.tab3, text="IN PROGRESS")
         self.manager.add(self.tab4, text="COMPLETED")
+        self.manager.add(self.tab5, text="ARCHIVE")
+        # The archive is read from disk the first time its tab is opened.
+        self.manager.bind("<<NotebookTabChanged>>", self.on_tab_changed)
 
 
-        self.task1 = self.create_treeview(self.tab1)
-        self.task2 = self.create_treeview(self.tab2)
-        self.task3 = self.create_treeview(self.tab3)
-        self.task4 = self.create_treeview(self.tab4)
+        self.task1 = self.create_task_list(self.tab1)
+        self.task2 = self.create_task_list(self.tab2)
+        self.task3 = self.create_task_list(self.tab3)
+        self.task4 = self.create_task_list(self.tab4)
+        self.archive_list = self.create_task_list(self.tab5)
+        self.archive_loaded = False
+        self.status_lists = {"TO DO": self.task2, "IN PROGRESS": self.task3, "COMPLETED": self.task4}
+        self.status_tabs = {"TO DO": self.tab2, "IN PROGRESS": self.tab3, "COMPLETED": self.tab4}
+        self.update_badges()
 
         self.remove_button = tk.Button(self, text="Remove task", background="gray70", command=self.on_remove_task)
         self.update_button = tk.Button(self, text="Update", background="dodgerblue2", command=self.on_update_task)
@@ -161,25 +386,91 @@ class Main(ttk.Frame):
             
     
 
-    def create_treeview(self, parent):
-        treeview = ttk.Treeview(parent, columns=("Task Name", "Priority", "Due date", "Status"))
-
-      
-        treeview.column("#0", width=50, stretch=False)
-        treeview.heading("#0", text="ID", anchor=tk.W, command=lambda: self.sort_column(treeview, "#0"))
-        treeview.heading("Task Name", text="Task Name", anchor=tk.W, command=lambda: self.sort_column(treeview, "Task Name"))
-        treeview.heading("Priority", text="Priority", anchor=tk.W, command=lambda: self.sort_column(treeview, "Priority"))
-        treeview.heading("Due date", text="Due date", anchor=tk.W, command=lambda: self.sort_column(treeview, "Due date"))
-        treeview.heading("Status", text="Status", anchor=tk.W, command=lambda: self.sort_column(treeview, "Status"))
+    def create_task_list(self, parent):
+        return TaskList(parent, self.task_manager, self.sort_column, virtual=self.virtual)
 
-    
-        treeview.column("Task Name", width=150, stretch=True)
-        treeview.column("Priority", width=100, stretch=False)
-        treeview.column("Due date", width=100, stretch=False)
-        treeview.column("Status", width=100, stretch=True)
-
-        treeview.pack(side="left", fill="both", expand=True)
-        return treeview
+    def current_list(self):
+        selected_tab_id = self.manager.select()
+        if not selected_tab_id:
+            messagebox.showwarning("Warning", "No tab selected.")
+            return None
+        selected_tab = self.manager.nametowidget(selected_tab_id)
+        for widget in selected_tab.winfo_children():
+            if isinstance(widget, TaskList):
+                return widget
+        messagebox.showwarning("Warning", "Selected tab does not contain a task list.")
+        return None
+
+    @timed('main.show_tasks')
+    def show_tasks(self, tasks):
+        """Fill the ALL tab with ``tasks`` and each status tab with its share."""
+        all_ids = []
+        by_status = {status: [] for status in self.status_lists}
+        for task in tasks:
+            all_ids.append(task['id'])
+            if task['status'] in by_status:
+                by_status[task['status']].append(task['id'])
+        self.task1.set_rows(all_ids)
+        for status, task_list in self.status_lists.items():
+            task_list.set_rows(by_status[status])
+
+    @timed('main.on_tasks_changed')
+    def on_tasks_changed(self, kind, task_ids):
+        """Apply a TaskManager change to the lists without rebuilding them."""
+        if self.filtered and kind in ('added', 'updated'):
+            # Search results only show changed tasks that still match the search.
+            get_task = self.task_manager.get_task_by_id
+            misses = {task_id for task_id in task_ids if not self.search_match(get_task(task_id))}
+            if misses:
+                for task_list in [self.task1, *self.status_lists.values()]:
+                    task_list.remove_rows(misses)
+                task_ids = [task_id for task_id in task_ids if task_id not in misses]
+        if kind == 'reset':
+            self.update_task_views()
+        elif kind == 'removed':
+            for task_list in [self.task1, self.task2, self.task3, self.task4, self.archive_list]:
+                task_list.remove_rows(task_ids)
+        elif kind == 'archived':
+            if self.archive_loaded:
+                self.archive_list.add_rows(task_ids)
+        elif kind == 'restored':
+            self.archive_list.remove_rows(task_ids)
+        elif kind == 'added':
+            self.task1.add_rows(task_ids)
+            for status, task_list in self.status_lists.items():
+                task_list.add_rows([task_id for task_id in task_ids
+                                    if self.task_manager.get_task_by_id(task_id)['status'] == status])
+        elif kind == 'updated':
+            if self.filtered:
+                self.task1.add_rows(task_ids)
+            self.task1.refresh_rows(task_ids)
+            statuses = {task_id: self.task_manager.get_task_by_id(task_id)['status'] for task_id in task_ids}
+            for status, task_list in self.status_lists.items():
+                leaving = [task_id for task_id in task_ids if task_id in task_list and statuses[task_id] != status]
+                entering = [task_id for task_id in task_ids if task_id not in task_list and statuses[task_id] == status]
+                task_list.remove_rows(leaving)
+                task_list.refresh_rows(task_ids)
+                task_list.add_rows(entering)
+        self.update_badges()
+
+    def update_badges(self):
+        """Show each tab's task count, read from the TaskManager's running totals."""
+        summary = self.task_manager.summary()
+        self.manager.tab(self.tab1, text=f"ALL ({summary['total']})")
+        for status, tab in self.status_tabs.items():
+            self.manager.tab(tab, text=f"{status} ({summary['by_status'].get(status, 0)})")
+        if self.archive_loaded:
+            self.manager.tab(self.tab5, text=f"ARCHIVE ({len(self.task_manager.archive)})")
+
+    def on_tab_changed(self, event):
+        if not self.archive_loaded and self.manager.select() == str(self.tab5):
+            self.show_archive()
+
+    @timed('main.show_archive')
+    def show_archive(self):
+        self.archive_list.set_rows([task['id'] for task in self.task_manager.archived_tasks()])
+        self.archive_loaded = True
+        self.update_badges()
 
     def layout_widgets(self):
         self.columnconfigure((0, 1, 2, 3), weight=1)
@@ -199,100 +490,80 @@ class Main(ttk.Frame):
         self.refresh_button.grid(row=2, column=1, padx=12, pady=12, sticky="ew") 
 
 
-    def on_search(self):
-        query = self.search_entry.get()
-        results = self.task_manager.search_tasks(query)
-        
-        if not query or query == self.placeholder_text:
-            return  
-
-        for treeview in [self.task1, self.task2, self.task3, self.task4]:
-            for item in treeview.get_children():
-                treeview.delete(item)
-                
-        for task in results:
-            task_id = task['id']
-            task_name = task['name']
-            task_priority = task['priority']
-            task_due_date = task['due_date']
-            task_status = task['status']
+    def on_search_typed(self, *args):
+        self.cancel_search()
+        self.search_job = self.after(SEARCH_DELAY_MS, lambda: self.on_search(live=True))
 
-            self.task1.insert("", "end", text=task_id, values=(task_name, task_priority, task_due_date, task_status))
+    def cancel_search(self):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+            self.search_job = None
 
-            if task_status == "TO DO":
-                self.task2.insert("", "end", text=task_id, values=(task_name, task_priority, task_due_date, task_status))
+    @timed('main.on_search')
+    def on_search(self, live=False):
+        # Whatever was still pending or running is for an older query.
+        self.cancel_search()
+        query = self.search_entry.get()
+        if not query or query == self.placeholder_text:
+            if self.filtered:
+                self.update_task_views()
+            return
 
-            elif task_status == "IN PROGRESS":
-                self.task3.insert("", "end", text=task_id, values=(task_name, task_priority, task_due_date, task_status))
+        try:
+            filters = parse_query(query)
+        except ValueError as e:
+            # Half-typed filters are normal while typing; only a click reports them.
+            if not live:
+                messagebox.showerror("Error", str(e))
+            return
+        self.search_query = query
+        if filters is not None:
+            self.show_search_results(self.task_manager.query(**filters))
+        else:
+            self.continue_search(self.task_manager.iter_search(query))
 
-            elif task_status == "COMPLETED":
-                self.task4.insert("", "end", text=task_id, values=(task_name, task_priority, task_due_date, task_status))
-                
-                
-                
-                
-                
-                
-                
-                
-                
-                
-                
-            
-    def on_remove_task(self):
-        selected_tab_id = self.manager.select()
-        if not selected_tab_id:
-            messagebox.showwarning("Warning", "No tab selected.")
+    def continue_search(self, steps):
+        results = next(steps)
+        if results is None:
+            # Let pending keystrokes in; a new query cancels this job.
+            self.search_job = self.after(1, lambda: self.continue_search(steps))
             return
+        self.search_job = None
+        self.show_search_results(results)
 
-        selected_tab = self.manager.nametowidget(selected_tab_id)
-        
-        treeview = None
-        for widget in selected_tab.winfo_children():
-            if isinstance(widget, ttk.Treeview):
-                treeview = widget
-                break
+    def show_search_results(self, results):
+        self.show_tasks(results)
+        self.filtered = True
+        self.search_match = self.task_manager.query_matcher(self.search_query)
 
-        if treeview is None:
-            messagebox.showwarning("Warning", "Selected tab does not contain a Treeview.")
+    def on_remove_task(self):
+        task_list = self.current_list()
+        if task_list is None:
             return
 
-        selected_items = treeview.selection()
-        if not selected_items:
+        task_ids = task_list.selected_ids()
+        if not task_ids:
             messagebox.showwarning("Warning", "No task selected for removal.")
             return
 
-        for item in selected_items:
-            task_id = int(treeview.item(item)["text"])
-            self.task_manager.remove_task(task_id)
-
-        self.update_task_views()
+        self.task_manager.remove_tasks(task_ids)
 
-    def sort_column(self, treeview, col):
+    @timed('main.sort_column')
+    def sort_column(self, task_list, col):
         if col == self.sort_column_name:
             self.sort_reverse = not self.sort_reverse
         else:
             self.sort_reverse = False  
        
         self.sort_column_name = col
-
-        
-        items = [(treeview.set(item, col), item) for item in treeview.get_children('')]
-        
-    
-        items.sort(key=lambda x: x[0], reverse=self.sort_reverse)
-        
-     
-        for ix, item in enumerate(items):
-            treeview.move(item[1], '', ix)
-        
-    
-        treeview.heading(col, command=lambda: self.sort_column(treeview, col))
+        task_list.sort_by(col, self.sort_reverse)
 
         
     def refresh(self):
-        """ Refresh the task views by reloading and updating all tasks """
-        self.update_task_views()   
+        """ Pick up changes from other instances and clear any search filter """
+        self.task_manager.sync()
+        if self.filtered:
+            self.update_task_views()   
         
         
         
@@ -300,31 +571,17 @@ class Main(ttk.Frame):
         
         
     def on_update_task(self):
-        selected_tab_id = self.manager.select()
-        if not selected_tab_id:
-            messagebox.showwarning("Warning", "No tab selected.")
-            return
-
-    
-        selected_tab = self.manager.nametowidget(selected_tab_id)
-
-        treeview = None
-        for widget in selected_tab.winfo_children():
-            if isinstance(widget, ttk.Treeview):
-                treeview = widget
-                break
-
-        if treeview is None:
-            messagebox.showwarning("Warning", "Selected tab does not contain a Treeview.")
+        task_list = self.current_list()
+        if task_list is None:
             return
 
-        selected_items = treeview.selection()
-        if not selected_items:
+        task_ids = task_list.selected_ids()
+        if not task_ids:
             messagebox.showwarning("Warning", "No task selected for update.")
             return
 
-        for item in selected_items:
-            task_id = int(treeview.item(item)["text"])
+        moves = {}
+        for task_id in task_ids:
             task = self.task_manager.get_task_by_id(task_id)
             if task is None:
                 messagebox.showerror("Error", "Task not found.")
@@ -342,36 +599,25 @@ class Main(ttk.Frame):
                 messagebox.showerror("Error", "Invalid task status.")
                 return
 
-            self.task_manager.update_task_status(task_id, new_status)
+            moves.setdefault(new_status, []).append(task_id)
 
-        self.update_task_views() 
+        with self.task_manager.batch():
+            for new_status, task_ids in moves.items():
+                self.task_manager.update_statuses(task_ids, new_status)
             
     
     def on_move_backward(self):
-        selected_tab_id = self.manager.select() 
-        if not selected_tab_id:
-            messagebox.showwarning("Warning", "No tab selected.")
+        task_list = self.current_list()
+        if task_list is None:
             return
 
-        selected_tab = self.manager.nametowidget(selected_tab_id)
-
-        treeview = None
-        for widget in selected_tab.winfo_children():
-            if isinstance(widget, ttk.Treeview):
-                treeview = widget
-                break
-
-        if treeview is None:
-            messagebox.showwarning("Warning", "Selected tab does not contain a Treeview.")
-            return
-
-        selected_items = treeview.selection()
-        if not selected_items:
+        task_ids = task_list.selected_ids()
+        if not task_ids:
             messagebox.showwarning("Warning", "No task selected for status update.")
             return
 
-        for item in selected_items:
-            task_id = int(treeview.item(item)["text"])
+        moves = {}
+        for task_id in task_ids:
             task = self.task_manager.get_task_by_id(task_id)
             if task is None:
                 messagebox.showerror("Error", "Task not found.")
@@ -391,9 +637,11 @@ class Main(ttk.Frame):
                 messagebox.showerror("Error", "Invalid task status.")
                 return
 
-            self.task_manager.update_task_status(task_id, new_status)
+            moves.setdefault(new_status, []).append(task_id)
 
-        self.update_task_views()
+        with self.task_manager.batch():
+            for new_status, task_ids in moves.items():
+                self.task_manager.update_statuses(task_ids, new_status)
             
     
     
@@ -415,27 +663,8 @@ class Main(ttk.Frame):
         
         
         
+    @timed('main.update_task_views')
     def update_task_views(self):
-        for treeview in [self.task1, self.task2, self.task3, self.task4]:
-            for item in treeview.get_children():
-                treeview.delete(item)
-
-        all_tasks = self.task_manager.get_tasks()
-
-        for task in all_tasks:
-            task_id = task['id']
-            task_name = task['name']
-            task_priority = task['priority']
-            task_due_date = task['due_date']
-            task_status = task['status']
-
-    
-            self.task1.insert("", "end", text=task_id, values=(task_name, task_priority, task_due_date, task_status))
-
-    
-            if task_status == "TO DO":
-                self.task2.insert("", "end", text=task_id, values=(task_name, task_priority, task_due_date, task_status))
-            elif task_status == "IN PROGRESS":
-                self.task3.insert("", "end", text=task_id, values=(task_name, task_priority, task_due_date, task_status))
-            elif task_status == "COMPLETED":
-                self.task4.insert("", "end", text=task_id, values=(task_name, task_priority, task_due_date, task_status))
\ No newline at end of file
+        self.cancel_search()
+        self.filtered = False
+        self.show_tasks(self.task_manager.tasks)
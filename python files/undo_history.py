@@ -0,0 +1,81 @@
+from collections import deque
+
+# Rough bytes per record on top of its field values; the cap is an estimate.
+RECORD_OVERHEAD = 200
+
+
+def record_size(op):
+    if op['op'] == 'add':
+        values = op['task'].values()
+    elif op['op'] == 'set':
+        values = op['fields'].values()
+    else:
+        return RECORD_OVERHEAD
+    return RECORD_OVERHEAD + sum(len(str(value)) for value in values)
+
+
+class UndoHistory:
+    """Undo and redo stacks of steps, each a list of journal records.
+
+    A step holds the records that reverse one change (one ``batch()``, so a
+    bulk action is one step); applying them yields the step that redoes it.
+    Records only carry what changed (an id, the old field values, or the
+    task that was removed), never a copy of the task list.  The estimated
+    size of both stacks stays under ``limit`` bytes by dropping the oldest
+    steps.
+    """
+
+    def __init__(self, limit=16 * 1024 * 1024):
+        self.limit = limit
+        self.undo_steps = deque()
+        self.redo_steps = deque()
+        self.size = 0
+
+    def __len__(self):
+        return len(self.undo_steps)
+
+    def can_undo(self):
+        return bool(self.undo_steps)
+
+    def can_redo(self):
+        return bool(self.redo_steps)
+
+    def record(self, ops):
+        """Remember the records that undo a new change; this forgets the redo steps."""
+        self._drop(self.redo_steps)
+        self.push_undo(ops)
+
+    def push_undo(self, ops):
+        self._push(self.undo_steps, ops)
+
+    def push_redo(self, ops):
+        self._push(self.redo_steps, ops)
+
+    def pop_undo(self):
+        return self._pop(self.undo_steps)
+
+    def pop_redo(self):
+        return self._pop(self.redo_steps)
+
+    def clear(self):
+        self._drop(self.undo_steps)
+        self._drop(self.redo_steps)
+
+    def _push(self, steps, ops):
+        size = sum(map(record_size, ops))
+        steps.append((ops, size))
+        self.size += size
+        for oldest in (self.undo_steps, self.redo_steps):
+            while self.size > self.limit and oldest:
+                self.size -= oldest.popleft()[1]
+
+    def _pop(self, steps):
+        if not steps:
+            return None
+        ops, size = steps.pop()
+        self.size -= size
+        return ops
+
+    def _drop(self, steps):
+        self.size -= sum(size for _, size in steps)
+        steps.clear()
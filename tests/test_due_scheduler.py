@@ -0,0 +1,229 @@
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from due_scheduler import DueScheduler, MAX_WAIT, OVERDUE, UPCOMING, midnight
+from storage import JournalStorage
+from task_export import CSV_HEADER
+from task_manager import TaskManager
+
+TODAY = date(2030, 6, 10)
+DAY = 24 * 3600
+
+
+def due(days):
+    return (TODAY + timedelta(days=days)).strftime('%m-%d-%Y')
+
+
+def day_start(days):
+    return midnight(TODAY.toordinal() + days)
+
+
+class FakeTk:
+    """A fake clock plus the ``after``/``after_cancel`` queue, run by ``advance``."""
+
+    def __init__(self, now):
+        self.now = now
+        self.jobs = {}
+        self.next_job = 0
+
+    def clock(self):
+        return self.now
+
+    def after(self, ms, callback):
+        self.next_job += 1
+        self.jobs[self.next_job] = (self.now + ms / 1000, callback)
+        return self.next_job
+
+    def after_cancel(self, job):
+        del self.jobs[job]
+
+    def advance(self, seconds):
+        end = self.now + seconds
+        while True:
+            ready = [(when, job) for job, (when, _) in self.jobs.items() if when <= end]
+            if not ready:
+                break
+            when, job = min(ready)
+            self.now = max(self.now, when)
+            self.jobs.pop(job)[1]()
+        self.now = end
+
+    def advance_to(self, when):
+        self.advance(when - self.now)
+
+
+class DueSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        filename = os.path.join(self.workdir, 'tasks.json')
+        self.manager = TaskManager(filename, storage=JournalStorage(filename))
+        self.late = self.manager.add_task('late', 'Low', due(-3))
+        self.tomorrow = self.manager.add_task('tomorrow', 'Low', due(1))
+        self.later = self.manager.add_task('later', 'Low', due(5))
+        self.done = self.manager.add_task('done', 'Low', due(-3))
+        self.manager.update_task_status(self.done, 'COMPLETED')
+        self.tk = FakeTk(day_start(0) + 10 * 3600)
+        self.events = []
+        self.scheduler = DueScheduler(self.manager, self.on_due, self.tk.after, self.tk.after_cancel,
+                                      clock=self.tk.clock)
+
+    def tearDown(self):
+        self.scheduler.stop()
+        self.manager.close()
+        shutil.rmtree(self.workdir)
+
+    def on_due(self, kind, task_ids):
+        self.events.append((kind, sorted(task_ids)))
+
+    def take_events(self):
+        events, self.events = self.events, []
+        return events
+
+    def assert_armed_for(self, when):
+        self.assertEqual(len(self.tk.jobs), 1)
+        self.assertEqual(self.scheduler.wake_at, when)
+        armed_at, _ = next(iter(self.tk.jobs.values()))
+        # Never later than the reminder, but no sleep is longer than MAX_WAIT.
+        self.assertLessEqual(armed_at, when + 0.01)
+        self.assertGreaterEqual(armed_at, min(when, self.tk.now))
+        self.assertLessEqual(armed_at, self.tk.now + MAX_WAIT + 0.01)
+
+    def test_start_reports_overdue_then_upcoming(self):
+        self.scheduler.start()
+        self.assertEqual(self.take_events(), [(OVERDUE, [self.late]), (UPCOMING, [self.tomorrow])])
+
+    def test_start_without_report(self):
+        self.scheduler.start(report=False)
+        self.assertEqual(self.events, [])
+        self.assertIn(self.tomorrow, self.scheduler.scheduled)
+
+    def test_one_job_for_the_earliest_reminder(self):
+        self.tk.now = day_start(0) - 600
+        self.scheduler.start()
+        self.assert_armed_for(day_start(0))
+        for days in range(3, 10):
+            self.manager.add_task('more', 'Low', due(days))
+        self.assert_armed_for(day_start(0))
+
+    def test_earlier_task_rearms_the_single_job(self):
+        self.scheduler.start()
+        self.assert_armed_for(day_start(2))
+        self.manager.add_task('new', 'High', due(2))
+        self.assert_armed_for(day_start(1))
+        self.manager.add_task('newer', 'High', due(3))
+        self.assert_armed_for(day_start(1))
+
+    def test_reminders_fire_as_the_clock_moves(self):
+        self.scheduler.start()
+        self.take_events()
+        self.tk.advance_to(day_start(2) + 60)
+        self.assertEqual(self.take_events(), [(OVERDUE, [self.tomorrow])])
+        self.tk.advance_to(day_start(4) + 60)
+        self.assertEqual(self.take_events(), [(UPCOMING, [self.later])])
+        self.tk.advance_to(day_start(6) + 60)
+        self.assertEqual(self.take_events(), [(OVERDUE, [self.later])])
+        self.assertEqual(self.scheduler.scheduled, {})
+        self.assertEqual(self.tk.jobs, {})
+
+    def test_long_sleep_reports_upcoming_as_overdue(self):
+        self.scheduler.start()
+        self.take_events()
+        self.tk.now += 30 * DAY
+        self.tk.advance(1)
+        self.assertEqual(self.take_events(), [(OVERDUE, [self.tomorrow, self.later])])
+
+    def test_completed_task_is_dropped_lazily(self):
+        self.scheduler.start()
+        self.take_events()
+        heap_size = len(self.scheduler.heap)
+        self.manager.update_task_status(self.later, 'COMPLETED')
+        self.assertNotIn(self.later, self.scheduler.scheduled)
+        self.assertEqual(len(self.scheduler.heap), heap_size)
+        self.tk.advance_to(day_start(7))
+        self.assertEqual(self.take_events(), [(OVERDUE, [self.tomorrow])])
+        self.assertEqual(self.scheduler.heap, [])
+
+    def test_redated_task_fires_only_at_its_new_time(self):
+        self.scheduler.start()
+        self.take_events()
+        self.manager.update_task_details(self.later, 'later', 'Low', due(20))
+        self.assertEqual(self.scheduler.scheduled[self.later], (day_start(19), UPCOMING))
+        self.tk.advance_to(day_start(18))
+        self.assertEqual(self.take_events(), [(OVERDUE, [self.tomorrow])])
+        self.assert_armed_for(day_start(19))
+        self.tk.advance_to(day_start(19) + 60)
+        self.assertEqual(self.take_events(), [(UPCOMING, [self.later])])
+
+    def test_removed_task_never_fires(self):
+        self.scheduler.start()
+        self.take_events()
+        self.manager.remove_task(self.tomorrow)
+        self.assertNotIn(self.tomorrow, self.scheduler.scheduled)
+        self.assert_armed_for(day_start(4))
+        self.tk.advance_to(day_start(7))
+        self.assertEqual(self.take_events(), [(UPCOMING, [self.later]), (OVERDUE, [self.later])])
+
+    def test_stale_entries_are_compacted(self):
+        self.scheduler.start()
+        for days in range(200):
+            self.manager.update_task_details(self.later, 'later', 'Low', due(10 + days))
+        scheduler = self.scheduler
+        self.assertLessEqual(len(scheduler.heap), 2 * len(scheduler.scheduled) + 64 + 1)
+        self.assertEqual(scheduler.scheduled[self.later], (day_start(10 + 199 - 1), UPCOMING))
+
+    def test_reopened_task_is_rescheduled(self):
+        self.scheduler.start()
+        self.take_events()
+        self.manager.update_task_status(self.later, 'COMPLETED')
+        self.assertNotIn(self.later, self.scheduler.scheduled)
+        self.manager.update_task_status(self.later, 'TO DO')
+        self.assertEqual(self.scheduler.scheduled[self.later], (day_start(4), UPCOMING))
+        self.tk.advance_to(day_start(4) + 60)
+        self.assertEqual(self.take_events(), [(OVERDUE, [self.tomorrow]), (UPCOMING, [self.later])])
+
+    def test_imported_tasks_are_scheduled(self):
+        self.scheduler.start()
+        self.take_events()
+        filename = os.path.join(self.workdir, 'import.csv')
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerow([100, 'imported', 'Low', due(1), 'TO DO'])
+            writer.writerow([101, 'closed', 'Low', due(1), 'COMPLETED'])
+        self.assertEqual(self.manager.import_tasks(filename).imported, 2)
+        self.assertIn(100, self.scheduler.scheduled)
+        self.assertNotIn(101, self.scheduler.scheduled)
+        self.assertEqual(len(self.tk.jobs), 1)
+        self.tk.advance_to(day_start(2) + 60)
+        self.assertEqual(self.take_events(), [(OVERDUE, [self.tomorrow, 100])])
+
+    def test_reset_reschedules_without_reporting(self):
+        self.scheduler.start()
+        self.take_events()
+        self.manager.tasks = [
+            {'id': 1, 'name': 'overdue', 'priority': 'Low', 'due_date': due(-1), 'status': 'TO DO'},
+            {'id': 7, 'name': 'next week', 'priority': 'Low', 'due_date': due(7), 'status': 'TO DO'},
+        ]
+        self.assertEqual(self.events, [])
+        self.assertEqual(self.scheduler.scheduled, {7: (day_start(6), UPCOMING)})
+        self.assert_armed_for(day_start(6))
+        self.tk.advance_to(day_start(6) + 60)
+        self.assertEqual(self.take_events(), [(UPCOMING, [7])])
+
+    def test_stop_cancels_the_job_and_unsubscribes(self):
+        self.scheduler.start()
+        self.scheduler.stop()
+        self.assertEqual(self.tk.jobs, {})
+        self.manager.add_task('after stop', 'Low', due(1))
+        self.assertEqual(self.tk.jobs, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from storage import JournalStorage
+
+
+def task(task_id, name='task', status='TO DO'):
+    return {'id': task_id, 'name': name, 'priority': 'Low', 'due_date': '01-31-2030', 'status': status}
+
+
+class JournalStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.workdir, 'tasks.json')
+        JournalStorage(self.filename).save([task(1), task(2)])
+        self.opened = []
+
+    def tearDown(self):
+        for storage in self.opened:
+            storage.close()
+        shutil.rmtree(self.workdir)
+
+    def open(self, **options):
+        storage = JournalStorage(self.filename, **options)
+        self.opened.append(storage)
+        return storage
+
+    def names(self, tasks):
+        return {task['id']: task['name'] for task in tasks}
+
+    def test_save_keeps_records_another_instance_appended(self):
+        ours = self.open()
+        theirs = self.open()
+        tasks = {task['id']: task for task in ours.load()}
+        theirs.load()
+        theirs.record([{'op': 'add', 'task': task(3, 'theirs')}], lambda: [])
+        tasks[1]['name'] = 'ours'
+        ours.record([{'op': 'set', 'id': 1, 'fields': {'name': 'ours'}}], lambda: tasks.values())
+        ours.save(list(tasks.values()))
+        self.assertFalse(os.path.exists(self.filename + '.journal'))
+        self.assertEqual(self.names(self.open().load()), {1: 'ours', 2: 'task', 3: 'theirs'})
+        # Our caller has not seen task 3 yet; the next poll brings it in.
+        ops = ours.poll_changes(list(tasks.values()))
+        self.assertIn({'op': 'add', 'task': task(3, 'theirs')}, ops)
+
+    def test_save_from_a_fresh_instance_writes_the_given_tasks(self):
+        self.open().save([task(task_id) for task_id in range(1, 201)])
+        self.assertEqual(len(self.open().load()), 200)
+
+    def test_compaction_waits_for_half_the_snapshot_size(self):
+        self.open().save([task(task_id) for task_id in range(1, 201)])
+        storage = self.open(compact_threshold=100)
+        tasks = {task['id']: task for task in storage.load()}
+        snapshot_size = os.path.getsize(self.filename)
+        journal = self.filename + '.journal'
+
+        def rename(count):
+            tasks[1]['name'] = f'edit {count}'
+            storage.record([{'op': 'set', 'id': 1, 'fields': {'name': tasks[1]['name']}}], lambda: tasks.values())
+
+        count = 0
+        written = 0
+        while written < snapshot_size // 2 - 100:
+            count += 1
+            rename(count)
+            written = os.path.getsize(journal)
+        self.assertGreater(written, storage.compact_threshold)
+        for _ in range(10):
+            count += 1
+            rename(count)
+        storage.flush()
+        self.assertLess(os.path.getsize(journal) if os.path.exists(journal) else 0, written)
+        self.assertEqual(self.names(self.open().load())[1], f'edit {count}')
+
+    def journal_size(self):
+        return os.path.getsize(self.filename + '.journal')
+
+    def test_torn_last_record_is_dropped_and_truncated(self):
+        storage = self.open()
+        storage.load()
+        storage.record([{'op': 'add', 'task': task(3, 'kept')}], lambda: [])
+        good_size = self.journal_size()
+        with open(self.filename + '.journal', 'ab') as f:
+            f.write(b'{"op":"add","task":{"id":9,"na')
+        self.assertEqual(self.names(self.open().load()), {1: 'task', 2: 'task', 3: 'kept'})
+        self.assertEqual(self.journal_size(), good_size)
+        storage = self.open()
+        storage.load()
+        storage.record([{'op': 'remove', 'id': 2}], lambda: [])
+        self.assertEqual(self.names(self.open().load()), {1: 'task', 3: 'kept'})
+
+    def test_unreadable_record_is_skipped(self):
+        storage = self.open()
+        storage.load()
+        with open(self.filename + '.journal', 'a') as f:
+            f.write('{not json}\n')
+        storage.record([{'op': 'set', 'id': 1, 'fields': {'name': 'after'}}], lambda: [])
+        self.assertEqual(self.names(self.open().load()), {1: 'after', 2: 'task'})
+
+    def test_segment_left_by_an_interrupted_compaction_is_replayed(self):
+        with open(self.filename + '.journal.1', 'w') as f:
+            f.write(json.dumps({'op': 'add', 'task': task(5, 'rotated')}) + '\n')
+        with open(self.filename + '.journal', 'w') as f:
+            f.write(json.dumps({'op': 'set', 'id': 5, 'fields': {'status': 'COMPLETED'}}) + '\n')
+        tasks = self.open().load()
+        self.assertEqual(self.names(tasks), {1: 'task', 2: 'task', 5: 'rotated'})
+        self.assertEqual([t['status'] for t in tasks if t['id'] == 5], ['COMPLETED'])
+
+    def test_poll_changes_returns_only_new_records(self):
+        ours = self.open()
+        theirs = self.open()
+        tasks = ours.load()
+        theirs.load()
+        self.assertEqual(ours.poll_changes(tasks), [])
+        op = {'op': 'set', 'id': 2, 'fields': {'name': 'theirs'}}
+        theirs.record([op], lambda: [])
+        self.assertEqual(ours.poll_changes(tasks), [op])
+        self.assertEqual(ours.poll_changes(tasks), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
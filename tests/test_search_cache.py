@@ -0,0 +1,38 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from search_cache import SearchCache
+
+
+class SearchCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = SearchCache(size=2)
+
+    def test_new_version_drops_every_entry(self):
+        self.cache.put(('ab',), 1, ['x'])
+        self.assertEqual(self.cache.get(('ab',), 1), ['x'])
+        self.assertIsNone(self.cache.get(('ab',), 2))
+        self.assertIsNone(self.cache.narrowing_base(('abc',), 1))
+
+    def test_narrowing_base_is_the_smallest_containing_result(self):
+        self.cache.put(('a',), 1, ['x', 'y', 'z'])
+        self.cache.put(('ab',), 1, ['x', 'y'])
+        self.assertEqual(self.cache.narrowing_base(('abc',), 1), ['x', 'y'])
+        self.assertEqual(self.cache.narrowing_base(('ax',), 1), ['x', 'y', 'z'])
+        self.assertIsNone(self.cache.narrowing_base(('b',), 1))
+        self.assertIsNone(self.cache.narrowing_base(('ab', 'c'), 1))
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.put(('a',), 1, [1])
+        self.cache.put(('b',), 1, [2])
+        self.cache.get(('a',), 1)
+        self.cache.put(('c',), 1, [3])
+        self.assertIsNone(self.cache.get(('b',), 1))
+        self.assertEqual(self.cache.get(('a',), 1), [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from sqlite_storage import SqliteStorage
+from task_manager import TaskManager
+from task_store import TaskStore
+
+NAMES = ['Ünïcode report', 'ünder review', 'Émile', 'émigré list', 'plain ascii', 'ÇA VA', 'ça marche',
+         'Straße', 'STRASSE', 'Ωmega', 'ωmega', 'Zebra', 'apple', 'Äpfel']
+class FailingCommits:
+    """A connection whose commits fail, as on a full disk or a database locked too long."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def commit(self):
+        raise sqlite3.OperationalError("database is locked")
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+
+TERMS = ['ün', 'ÜN', 'ï', 'Ü', 'é', 'É', 'ça', 'ÇA', 'ω', 'Ω', 'ße', 'äp', 'ÄPF', 'ünïc', 'ÉMIG', 'a', '1']
+
+
+class SqliteStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.tasks = [{'id': task_id, 'name': name, 'priority': 'Low', 'due_date': '01-31-2030',
+                       'status': 'TO DO'} for task_id, name in enumerate(NAMES, 1)]
+        self.memory = TaskStore(self.tasks)
+        self.storage = SqliteStorage(os.path.join(self.workdir, 'tasks.db'))
+        self.storage.reset(self.tasks)
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.workdir)
+
+    def ids(self, tasks):
+        return sorted(task['id'] for task in tasks)
+
+    def assert_same_matches(self):
+        for term in TERMS:
+            terms = [term.lower()]
+            self.assertEqual(self.ids(self.storage.search(terms)), self.ids(self.memory.search(terms)), term)
+            self.assertEqual(self.ids(self.storage.query(name=term.lower())),
+                             self.ids(self.memory.query(name=term.lower())), term)
+
+    def test_search_folds_case_beyond_ascii(self):
+        self.assert_same_matches()
+        self.assertEqual(self.ids(self.storage.search(['ün'])), [1, 2])
+
+    def test_search_without_full_text_index(self):
+        self.storage.fts = False
+        self.assert_same_matches()
+
+    def test_name_sort_matches_memory(self):
+        for reverse in (False, True):
+            self.assertEqual(self.storage.sorted_ids('name', reverse), self.memory.sorted_ids('name', reverse))
+
+    def test_snapshot_stream_uses_the_same_matching(self):
+        self.storage.conn.commit()
+        rows = list(self.storage.snapshot(name='ün'))
+        self.assertEqual(self.ids(rows), [1, 2])
+
+    def test_commit_errors_go_to_on_error(self):
+        errors = []
+        self.storage.on_error = errors.append
+        manager = TaskManager(storage=self.storage)
+        conn = self.storage.conn
+        self.storage.conn = FailingCommits(conn)
+        task_id = manager.add_task('kept', 'High', '02-01-2030')
+        manager.flush()
+        self.assertEqual(errors, ["Error saving tasks: database is locked"] * 2)
+        self.storage.conn = conn
+        manager.flush()
+        other = sqlite3.connect(self.storage.filename)
+        try:
+            row = other.execute("SELECT name FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        finally:
+            other.close()
+        self.assertEqual(row, ('kept',))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from storage import JournalStorage
+from task_manager import TaskManager
+
+
+class TaskArchiveErrorsTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.workdir, 'tasks.json')
+        self.archive_filename = self.filename + '.archive'
+        self.errors = []
+        storage = JournalStorage(self.filename)
+        storage.on_error = self.errors.append
+        self.manager = TaskManager(self.filename, storage=storage)
+        self.task_id = self.manager.add_task('old', 'Low', '01-31-2000')
+        self.manager.update_task_status(self.task_id, 'COMPLETED')
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.workdir)
+
+    def test_archive_write_error_goes_to_on_error(self):
+        os.mkdir(self.archive_filename)
+        self.assertEqual(self.manager.archive_completed(30), 0)
+        self.assertEqual(len(self.errors), 1)
+        self.assertTrue(self.errors[0].startswith("Error archiving tasks:"))
+        self.assertIsNotNone(self.manager.get_task_by_id(self.task_id))
+
+    def test_restore_error_goes_to_on_error(self):
+        self.assertEqual(self.manager.archive_completed(30), 1)
+        self.manager.archived_tasks()
+        os.remove(self.archive_filename)
+        os.mkdir(self.archive_filename)
+        self.manager.restore_tasks([self.task_id])
+        self.assertEqual(len(self.errors), 1)
+        self.assertTrue(self.errors[0].startswith("Error updating archive:"))
+
+    def test_unreadable_record_goes_to_on_error(self):
+        self.assertEqual(self.manager.archive_completed(30), 1)
+        with open(self.archive_filename, 'ab') as f:
+            f.write(b'{not json}\n')
+        self.manager.archive.store = None
+        self.assertEqual([task['id'] for task in self.manager.archived_tasks()], [self.task_id])
+        self.assertEqual(len(self.errors), 1)
+        self.assertTrue(self.errors[0].startswith("Error reading archive"))
+
+
+if __name__ == '__main__':
+    unittest.main()
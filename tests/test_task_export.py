@@ -0,0 +1,61 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from storage import JournalStorage
+from task_export import detect_format, with_extension
+from task_manager import TaskManager
+from task_model import Task
+
+
+class WithExtensionTest(unittest.TestCase):
+    def test_chosen_type_decides_a_bare_name(self):
+        self.assertEqual(with_extension('/tmp/tasks', "JSON Lines"), '/tmp/tasks.jsonl')
+        self.assertEqual(with_extension('/tmp/tasks', "JSON Lines (gzip)"), '/tmp/tasks.jsonl.gz')
+        self.assertEqual(with_extension('/tmp/tasks', "CSV files (gzip)"), '/tmp/tasks.csv.gz')
+        self.assertEqual(with_extension('/tmp/tasks', "All files"), '/tmp/tasks.csv')
+
+    def test_typed_extension_is_kept(self):
+        self.assertEqual(with_extension('/tmp/tasks.csv', "JSON Lines"), '/tmp/tasks.csv')
+        self.assertEqual(with_extension('/tmp/tasks.JSONL.gz', "CSV files"), '/tmp/tasks.JSONL.gz')
+        self.assertEqual(with_extension('/tmp/tasks.ndjson', "CSV files"), '/tmp/tasks.ndjson')
+
+    def test_result_names_the_chosen_format(self):
+        self.assertEqual(detect_format(with_extension('report', "JSON Lines (gzip)")), ('jsonl', True))
+        self.assertEqual(detect_format(with_extension('report.txt', "JSON Lines")), ('jsonl', False))
+
+
+class ExportSourceTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        filename = os.path.join(self.workdir, 'tasks.json')
+        self.manager = TaskManager(filename, storage=JournalStorage(filename))
+        self.first = self.manager.add_task('first', 'High', '01-31-2030')
+        self.manager.add_task('second', 'Low', '02-28-2030')
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.workdir)
+
+    def test_export_source_is_a_copy(self):
+        tasks = self.manager.export_source()
+        filtered = self.manager.export_source({'priority': ['High']})
+        self.manager.update_task_details(self.first, 'renamed', 'Low', '03-31-2030')
+        self.manager.update_task_status(self.first, 'COMPLETED')
+        self.assertEqual(type(tasks[0]), dict)
+        self.assertEqual(tasks[0], {'id': self.first, 'name': 'first', 'priority': 'High',
+                                    'due_date': '01-31-2030', 'status': 'TO DO'})
+        self.assertEqual(filtered, [tasks[0]])
+
+    def test_task_copy_keeps_extra_fields(self):
+        task = Task(1, 'name', 'Low', '01-31-2030', 'TO DO', {'notes': 'x'})
+        self.assertEqual(task.copy(), dict(task))
+        self.assertEqual(task.copy()['notes'], 'x')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from id_allocator import SequenceAllocator
+from storage import JournalStorage
+from task_manager import TaskManager
+
+
+class TaskManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.workdir, 'tasks.json')
+        self.manager = self.open()
+        self.first = self.manager.add_task('first', 'High', '01-31-2030')
+        self.second = self.manager.add_task('second', 'Low', '02-28-2030')
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.workdir)
+
+    def open(self):
+        return TaskManager(self.filename, storage=JournalStorage(self.filename))
+
+    def test_get_tasks_returns_plain_dict_copies(self):
+        tasks = self.manager.get_tasks()
+        self.assertEqual([type(task) for task in tasks], [dict, dict])
+        json.dumps(tasks)
+        tasks[0]['name'] = 'changed'
+        self.assertEqual(self.manager.get_task_by_id(self.first)['name'], 'first')
+        self.assertEqual(self.manager.get_tasks('TO DO')[1], {
+            'id': self.second, 'name': 'second', 'priority': 'Low', 'due_date': '02-28-2030',
+            'status': 'TO DO'})
+
+    def test_tasks_is_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.manager.tasks.append({'id': 99})
+        self.assertEqual([task['id'] for task in self.manager.tasks], [self.first, self.second])
+
+    def test_tasks_setter_replaces_the_list(self):
+        events = []
+        self.manager.subscribe(lambda kind, ids: events.append(kind))
+        self.manager.tasks = [{'id': 7, 'name': 'only', 'priority': 'Low', 'due_date': '03-31-2030',
+                               'status': 'TO DO'}]
+        self.assertEqual(events, ['reset'])
+        self.assertEqual([task['id'] for task in self.manager.get_tasks()], [7])
+        self.assertGreater(self.manager.add_task('next', 'Low', '03-31-2030'), 7)
+
+
+    def names(self, manager):
+        return {task['id']: (task['name'], task['status']) for task in manager.get_tasks()}
+
+    def test_failed_batch_is_rolled_back_and_not_saved(self):
+        before = self.names(self.manager)
+        events = []
+        self.manager.subscribe(lambda kind, ids: events.append(kind))
+        with self.assertRaises(ValueError):
+            with self.manager.batch():
+                self.manager.add_task('third', 'Medium', '03-31-2030')
+                self.manager.update_task_status(self.first, 'COMPLETED')
+                self.manager.remove_task(self.second)
+                raise ValueError('stop')
+        self.assertEqual(self.names(self.manager), before)
+        self.assertEqual(events, [])
+        self.assertEqual(self.manager.search_tasks('third'), [])
+        self.manager.flush()
+        reopened = self.open()
+        try:
+            self.assertEqual(self.names(reopened), before)
+        finally:
+            reopened.close()
+
+    def test_batch_is_saved_and_notified_once(self):
+        events = []
+        self.manager.subscribe(lambda kind, ids: events.append((kind, sorted(ids))))
+        with self.manager.batch():
+            third = self.manager.add_task('third', 'Medium', '03-31-2030')
+            self.manager.update_task_status(self.first, 'COMPLETED')
+            self.manager.update_task_status(self.second, 'COMPLETED')
+        self.assertEqual(events, [('added', [third]), ('updated', [self.first, self.second])])
+        self.manager.flush()
+        reopened = self.open()
+        try:
+            self.assertEqual(self.names(reopened), self.names(self.manager))
+        finally:
+            reopened.close()
+
+    def test_undo_and_redo(self):
+        start = self.names(self.manager)
+        self.manager.update_task_status(self.first, 'COMPLETED')
+        with self.manager.batch():
+            self.manager.remove_task(self.first)
+            self.manager.update_task_details(self.second, 'renamed', 'High', '02-28-2030')
+        after = self.names(self.manager)
+        self.assertEqual(after, {self.second: ('renamed', 'TO DO')})
+        self.assertTrue(self.manager.undo())
+        self.assertEqual(self.names(self.manager), {self.first: ('first', 'COMPLETED'),
+                                                    self.second: ('second', 'TO DO')})
+        self.assertTrue(self.manager.undo())
+        self.assertEqual(self.names(self.manager), start)
+        self.assertTrue(self.manager.redo())
+        self.assertTrue(self.manager.redo())
+        self.assertEqual(self.names(self.manager), after)
+        self.assertFalse(self.manager.redo())
+        self.assertTrue(self.manager.undo())
+        self.manager.flush()
+        reopened = self.open()
+        try:
+            self.assertEqual(self.names(reopened), self.names(self.manager))
+        finally:
+            reopened.close()
+
+    def test_new_change_clears_redo(self):
+        self.manager.remove_task(self.second)
+        self.assertTrue(self.manager.undo())
+        self.manager.update_task_status(self.first, 'COMPLETED')
+        self.assertFalse(self.manager.redo())
+        self.assertIsNotNone(self.manager.get_task_by_id(self.second))
+
+    def test_narrowed_search_sees_later_changes(self):
+        self.assertEqual([task['id'] for task in self.manager.search_tasks('fi')], [self.first])
+        third = self.manager.add_task('fix', 'Low', '03-31-2030')
+        self.assertEqual([task['id'] for task in self.manager.search_tasks('fi')], [self.first, third])
+        self.assertEqual([task['id'] for task in self.manager.search_tasks('fix')], [third])
+        self.manager.update_task_details(self.first, 'fixed', 'High', '01-31-2030')
+        self.assertEqual([task['id'] for task in self.manager.search_tasks('fix')], [self.first, third])
+
+
+class SharedIdsTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.workdir, 'tasks.json')
+        self.managers = [TaskManager(self.filename, storage=JournalStorage(self.filename),
+                                     allocator=SequenceAllocator(block=5))
+                         for _ in range(2)]
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.close()
+        shutil.rmtree(self.workdir)
+
+    def test_instances_sharing_a_file_never_hand_out_the_same_id(self):
+        ids = []
+        for step in range(40):
+            manager = self.managers[step % 3 % 2]
+            ids.append(manager.add_task(f"task {step}", 'Low', '01-31-2030'))
+        self.assertEqual(len(set(ids)), len(ids))
+        for manager in self.managers:
+            manager.sync()
+            self.assertEqual(sorted(task['id'] for task in manager.get_tasks()), sorted(ids))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python files'))
+
+from task_query import due_key, filter_matcher
+from task_store import TaskStore
+
+PRIORITIES = ['Low', 'Medium', 'High']
+STATUSES = ['TO DO', 'IN PROGRESS', 'COMPLETED']
+
+
+def random_task(rng, task_id):
+    return {'id': task_id, 'name': f"task {rng.randrange(1000)}", 'priority': rng.choice(PRIORITIES),
+            'due_date': f"{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}-2030",
+            'status': rng.choice(STATUSES)}
+
+
+class DeferredIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(15)
+        self.store = TaskStore(random_task(self.rng, task_id) for task_id in range(1, 501))
+
+    def expected(self, **filters):
+        matches = filter_matcher(**filters)
+        return sorted(task['id'] for task in self.store if matches(task))
+
+    def assert_queries_match(self):
+        low, high = due_key('03-01-2030'), due_key('06-30-2030')
+        for filters in ({'priority': ['high']}, {'due_from': low, 'due_to': high},
+                        {'priority': ['Low', 'Medium'], 'due_to': high, 'status': ['TO DO']},
+                        {'name': 'task 1', 'priority': ['Medium']}):
+            self.assertEqual([task['id'] for task in self.store.query(**filters)],
+                             self.expected(**filters), filters)
+
+    def test_only_first_screen_indexes_are_built_on_reset(self):
+        self.assertEqual(self.store.pending_indexes, [self.store.priority_index, self.store.due_index])
+        self.assertEqual(self.store.priority_index.buckets, {})
+        self.assertEqual(self.store.due_index.entries, [])
+        self.assertEqual(sum(map(len, self.store.by_status.values())), 500)
+
+    def test_edits_before_the_deferred_build_are_indexed(self):
+        for task_id in range(1, 100):
+            self.store.update(task_id, {'priority': self.rng.choice(PRIORITIES), 'due_date': '04-15-2030'})
+        for task_id in range(100, 150):
+            self.store.delete(task_id)
+        for task_id in range(1000, 1050):
+            self.store.insert(random_task(self.rng, task_id))
+        self.assert_queries_match()
+        self.assertEqual(self.store.pending_indexes, [])
+        self.store.update(7, {'priority': 'High', 'due_date': '05-05-2030'})
+        self.store.delete(8)
+        self.assert_queries_match()
+
+    def test_finish_indexing_works_in_slices(self):
+        steps = 1
+        while not self.store.finish_indexing(100):
+            steps += 1
+        # One step per deferred query index, then 500 tasks of n-grams in slices of 100.
+        self.assertEqual(steps, 2 + 5)
+        self.assertEqual(self.store.pending_indexes, [])
+        self.assert_queries_match()
+
+
+if __name__ == '__main__':
+    unittest.main()